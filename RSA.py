@@ -7,8 +7,25 @@ L'algorithme RSA est basé sur la difficulté de factoriser le produit de deux g
 - Clé privée (n, d) : utilisée pour déchiffrer
 """
 
+import os
 import random
 import math
+from concurrent.futures import ProcessPoolExecutor
+
+import primalite
+from exponentiation_modulaire import get_engine
+
+
+# Octets de bourrage minimum imposés par PKCS#1 v1.5 (00 02 PS 00, |PS| >= 8)
+PKCS1_OVERHEAD = 11
+
+# Coût estimé d'une multiplication modulaire de 1024 bits (secondes) ; il
+# croît à peu près comme (bits / 1024) ** 1.6
+MODMUL_SECONDS_1024 = 9e-6
+
+# Travail séquentiel estimé (secondes) à confier au minimum à chaque
+# processus : en dessous, démarrer le pool coûte plus qu'il ne rapporte
+PARALLEL_MIN_SECONDS = 0.1
 
 
 def is_prime(n: int, k: int = 10) -> bool:
@@ -57,22 +74,16 @@ def random_prime(bits: int) -> int:
     """
     Génère un nombre premier aléatoire de la taille spécifiée en bits.
     
+    Les candidats sont criblés par les petits nombres premiers puis testés
+    par lots avec le test BPSW (voir primalite.py).
+    
     Args:
         bits: Le nombre de bits souhaité pour le nombre premier
     
     Returns:
         Un nombre premier aléatoire
     """
-    while True:
-        # Générer un nombre aléatoire de 'bits' bits
-        n = random.getrandbits(bits)
-        # S'assurer que le bit de poids fort est à 1 (pour avoir exactement 'bits' bits)
-        n |= (1 << (bits - 1))
-        # S'assurer que le nombre est impair
-        n |= 1
-        
-        if is_prime(n):
-            return n
+    return primalite.random_prime(bits)
 
 
 def gcd(a: int, b: int) -> int:
@@ -126,7 +137,7 @@ def modular_inverse(e: int, phi: int) -> int:
     return x1
 
 
-def rsa_keygen(keysize: int = 1024) -> tuple:
+def rsa_keygen(keysize: int = 1024, crt: bool = False) -> tuple:
     """
     Génère une paire de clés RSA (publique et privée).
     
@@ -140,11 +151,14 @@ def rsa_keygen(keysize: int = 1024) -> tuple:
     
     Args:
         keysize: La taille de la clé en bits (par défaut 1024)
+        crt: Si True, la clé privée contient aussi les paramètres du
+             théorème des restes chinois (déchiffrement et signature
+             environ 3 fois plus rapides)
     
     Returns:
         Un tuple (clé_publique, clé_privée) où:
         - clé_publique = (n, e)
-        - clé_privée = (n, d)
+        - clé_privée = (n, d), ou (n, d, p, q, dp, dq, qinv) si crt=True
     """
     # 1. Choisir deux grands nombres premiers distincts
     p = random_prime(keysize // 2)
@@ -176,6 +190,10 @@ def rsa_keygen(keysize: int = 1024) -> tuple:
     public_key = (n, e)   # PK = (n, e)
     private_key = (n, d)  # SK = (n, d)
     
+    if crt:
+        # dp = d mod (p-1), dq = d mod (q-1), qinv = q^-1 mod p
+        private_key = (n, d, p, q, d % (p - 1), d % (q - 1), modular_inverse(q, p))
+    
     return public_key, private_key
 
 
@@ -198,8 +216,8 @@ def rsa_encrypt(m: int, public_key: tuple) -> int:
     if m < 0 or m >= n:
         raise ValueError(f"Le message doit être un entier entre 0 et {n-1}")
     
-    # Calculer c = m^e mod n
-    c = pow(m, e, n)
+    # Calculer c = m^e mod n (moteur précalculé pour cette clé publique)
+    c = get_engine(n, e)(m)
     
     return c
 
@@ -210,13 +228,23 @@ def rsa_decrypt(c: int, private_key: tuple) -> int:
     
     Formule: m = c^d mod n
     
+    Avec une clé CRT, le calcul se fait modulo p et modulo q (exposants
+    deux fois plus courts) puis les résultats sont recombinés (Garner).
+    
     Args:
         c: Le texte chiffré (entier)
-        private_key: La clé privée (n, d)
+        private_key: La clé privée (n, d) ou (n, d, p, q, dp, dq, qinv)
     
     Returns:
         Le message déchiffré m (entier)
     """
+    if len(private_key) == 7:
+        _, _, p, q, dp, dq, qinv = private_key
+        m1 = pow(c, dp, p)
+        m2 = pow(c, dq, q)
+        h = qinv * (m1 - m2) % p
+        return m2 + h * q
+    
     n, d = private_key
     
     # Calculer m = c^d mod n
@@ -290,6 +318,231 @@ def rsa_decrypt_text(c: int, private_key: tuple) -> str:
     return int_to_text(m)
 
 
+def modulus_byte_length(n: int) -> int:
+    """
+    Calcule la taille en octets du module n (taille d'un bloc chiffré).
+
+    Args:
+        n: Le module RSA
+
+    Returns:
+        Le nombre d'octets nécessaires pour représenter n
+    """
+    return (n.bit_length() + 7) // 8
+
+
+def pkcs1_pad(message: bytes, block_size: int) -> bytes:
+    """
+    Applique le bourrage PKCS#1 v1.5 (type 2, chiffrement) à un bloc.
+
+    Format: 0x00 || 0x02 || PS || 0x00 || message
+    où PS est composé d'au moins 8 octets aléatoires non nuls.
+
+    Args:
+        message: Les octets à chiffrer (au plus block_size - 11 octets)
+        block_size: La taille du module en octets
+
+    Returns:
+        Le bloc bourré de block_size octets
+
+    Raises:
+        ValueError: Si le message est trop long pour le bloc
+    """
+    padding_length = block_size - len(message) - 3
+    if padding_length < 8:
+        raise ValueError(f"Bloc trop long: au plus {block_size - PKCS1_OVERHEAD} octets")
+
+    # Tirer des octets aléatoires non nuls pour PS
+    padding = os.urandom(padding_length).replace(b"\x00", b"")
+    while len(padding) < padding_length:
+        padding += os.urandom(padding_length - len(padding)).replace(b"\x00", b"")
+
+    return b"\x00\x02" + padding + b"\x00" + message
+
+
+def pkcs1_unpad(block: bytes) -> bytes:
+    """
+    Retire le bourrage PKCS#1 v1.5 (type 2) d'un bloc déchiffré.
+
+    Args:
+        block: Le bloc déchiffré, de la taille du module
+
+    Returns:
+        Le message contenu dans le bloc
+
+    Raises:
+        ValueError: Si le bourrage est invalide
+    """
+    separator = block.find(b"\x00", 2)
+    if block[:2] != b"\x00\x02" or separator < 10:
+        raise ValueError("Bourrage PKCS#1 invalide")
+    return block[separator + 1:]
+
+
+def _encrypt_blocks(data: bytes, public_key: tuple) -> bytes:
+    """
+    Chiffre une suite de blocs consécutifs (exécuté dans un processus du pool).
+
+    Args:
+        data: Les octets à chiffrer
+        public_key: La clé publique (n, e)
+
+    Returns:
+        La concaténation des blocs chiffrés, chacun sur la taille du module
+    """
+    n, e = public_key
+    block_size = modulus_byte_length(n)
+    chunk_size = block_size - PKCS1_OVERHEAD
+    engine = get_engine(n, e)
+    view = memoryview(data)
+    output = bytearray()
+
+    for start in range(0, len(data), chunk_size):
+        block = pkcs1_pad(bytes(view[start:start + chunk_size]), block_size)
+        c = engine(int.from_bytes(block, 'big'))
+        output += c.to_bytes(block_size, 'big')
+
+    return bytes(output)
+
+
+def _decrypt_blocks(data: bytes, private_key: tuple) -> bytes:
+    """
+    Déchiffre une suite de blocs consécutifs (exécuté dans un processus du pool).
+
+    Args:
+        data: Les blocs chiffrés concaténés
+        private_key: La clé privée (n, d) ou sa forme CRT
+
+    Returns:
+        La concaténation des messages contenus dans les blocs
+    """
+    n = private_key[0]
+    block_size = modulus_byte_length(n)
+    view = memoryview(data)
+    output = bytearray()
+
+    for start in range(0, len(data), block_size):
+        c = int.from_bytes(view[start:start + block_size], 'big')
+        if c >= n:
+            raise ValueError("Bloc chiffré invalide pour cette clé")
+        output += pkcs1_unpad(rsa_decrypt(c, private_key).to_bytes(block_size, 'big'))
+
+    return bytes(output)
+
+
+def _auto_workers(block_count: int, modulus_bits: int, exponent_bits: int) -> int:
+    """
+    Choisit le nombre de processus d'après le travail estimé.
+
+    Chaque processus doit recevoir au moins PARALLEL_MIN_SECONDS de calcul,
+    sans dépasser le nombre de cœurs : avec e = 65537 ou sur une machine à
+    un cœur, le traitement reste séquentiel.
+
+    Args:
+        block_count: Le nombre de blocs
+        modulus_bits: La taille du module en bits
+        exponent_bits: Le nombre de carrés par bloc (taille de l'exposant)
+
+    Returns:
+        Le nombre de processus (1 = séquentiel)
+    """
+    per_block = exponent_bits * 1.2 * MODMUL_SECONDS_1024 * (modulus_bits / 1024) ** 1.6
+    workers = int(block_count * per_block / PARALLEL_MIN_SECONDS)
+    return max(1, min(os.cpu_count() or 1, workers))
+
+
+def _run_blocks(function, data: bytes, key: tuple, step: int, workers: int,
+                exponent_bits: int) -> bytes:
+    """
+    Découpe les données en groupes de blocs et les traite en parallèle.
+
+    Les découpes sont faites par tranches de memoryview, sans copie
+    intermédiaire des données d'entrée ; seul chaque groupe envoyé à un
+    processus est copié.
+
+    Args:
+        function: _encrypt_blocks ou _decrypt_blocks
+        data: Les données à traiter
+        key: La clé à utiliser
+        step: La taille d'un bloc d'entrée en octets
+        workers: Le nombre de processus (None = choisi par _auto_workers)
+        exponent_bits: La taille équivalente de l'exposant, pour l'estimation
+
+    Returns:
+        La concaténation des résultats, dans l'ordre des blocs
+    """
+    block_count = -(-len(data) // step)
+    if workers is None:
+        workers = _auto_workers(block_count, key[0].bit_length(), exponent_bits)
+    if workers <= 1 or block_count < 2:
+        return function(data, key)
+
+    # Répartir les blocs en groupes contigus, un ou deux par processus
+    blocks_per_group = -(-block_count // (workers * 2))
+    group_size = blocks_per_group * step
+    view = memoryview(data)
+    groups = [bytes(view[i:i + group_size]) for i in range(0, len(data), group_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return b"".join(pool.map(function, groups, [key] * len(groups)))
+
+
+def rsa_encrypt_bytes(data: bytes, public_key: tuple, workers: int = None) -> bytes:
+    """
+    Chiffre des octets de longueur quelconque avec RSA et le bourrage PKCS#1 v1.5.
+
+    Les données sont découpées en morceaux de (taille du module - 11) octets,
+    chaque morceau est bourré puis chiffré. Le résultat est une suite de
+    blocs de taille fixe (la taille du module), sans perte des octets nuls
+    de tête.
+
+    Args:
+        data: Les octets à chiffrer
+        public_key: La clé publique (n, e)
+        workers: Le nombre de processus (None = selon le travail estimé et
+                 le nombre de cœurs, 1 = séquentiel)
+
+    Returns:
+        Les blocs chiffrés concaténés
+
+    Raises:
+        ValueError: Si le module est trop petit pour le bourrage
+    """
+    n, e = public_key
+    chunk_size = modulus_byte_length(n) - PKCS1_OVERHEAD
+    if chunk_size <= 0:
+        raise ValueError("Le module est trop petit pour le bourrage PKCS#1")
+    return _run_blocks(_encrypt_blocks, bytes(data), public_key, chunk_size, workers,
+                       e.bit_length())
+
+
+def rsa_decrypt_bytes(data: bytes, private_key: tuple, workers: int = None) -> bytes:
+    """
+    Déchiffre des blocs produits par rsa_encrypt_bytes.
+
+    Args:
+        data: Les blocs chiffrés concaténés
+        private_key: La clé privée (n, d) ou sa forme CRT
+        workers: Le nombre de processus (None = selon le travail estimé et
+                 le nombre de cœurs, 1 = séquentiel)
+
+    Returns:
+        Les octets d'origine
+
+    Raises:
+        ValueError: Si la longueur ou le bourrage des blocs est invalide
+    """
+    n = private_key[0]
+    block_size = modulus_byte_length(n)
+    if len(data) % block_size != 0:
+        raise ValueError(f"La longueur doit être un multiple de {block_size} octets")
+    # CRT : deux exposants de moitié sur des modules de moitié, soit environ
+    # un quart du travail de l'exposant complet
+    exponent_bits = n.bit_length() // 4 if len(private_key) == 7 else private_key[1].bit_length()
+    return _run_blocks(_decrypt_blocks, bytes(data), private_key, block_size, workers,
+                       exponent_bits)
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     print("=" * 60)
@@ -301,7 +554,7 @@ if __name__ == "__main__":
     public_key, private_key = rsa_keygen(512)
     
     n, e = public_key
-    _, d = private_key
+    d = private_key[1]  # (n, d) ou forme CRT (n, d, p, q, dp, dq, qinv)
     
     print(f"\n[PUBLIC KEY] Cle publique (n, e):")
     print(f"   n = {n}")
@@ -334,6 +587,18 @@ if __name__ == "__main__":
     decrypted_text = rsa_decrypt_text(encrypted_text, private_key)
     print(f"   Message déchiffré: {decrypted_text}")
     
+    # Test avec des octets (bourrage PKCS#1 v1.5, blocs de taille fixe)
+    print("\n" + "-" * 60)
+    print("[4] Test avec des octets (message plus long que le module)")
+    message_bytes = b"\x00\x00" + "Message UTF-8 : élève, façade, 日本 ".encode('utf-8') * 4
+    print(f"   Taille du message: {len(message_bytes)} octets")
+    
+    encrypted_bytes = rsa_encrypt_bytes(message_bytes, public_key)
+    print(f"   Message chiffré  : {len(encrypted_bytes)} octets ({encrypted_bytes.hex()[:32]}...)")
+    
+    decrypted_bytes = rsa_decrypt_bytes(encrypted_bytes, private_key)
+    print(f"   Identique        : {decrypted_bytes == message_bytes}")
+    
     print("\n" + "=" * 60)
     print("[OK] Demonstration terminee!")
     print("=" * 60)
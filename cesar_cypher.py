@@ -1,4 +1,6 @@
-import random
+from functools import lru_cache
+
+import materiel_cles
 
 def cesar_encrypt(plaintext, shift):
     """
@@ -51,11 +53,58 @@ def cesar_decrypt(ciphertext, shift):
     # Déchiffrer = chiffrer avec le décalage inverse
     return cesar_encrypt(ciphertext, -shift)
 
+
+class _CesarTable(dict):
+    """
+    Table de str.translate pour César, complétée à la demande.
+
+    Chaque caractère est traité une fois avec la formule de cesar_encrypt
+    (isalpha / isupper compris) puis mis en cache.
+    """
+
+    def __init__(self, shift):
+        super().__init__()
+        self.shift = shift
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char.isalpha():
+            origin = ord('A') if char.isupper() else ord('a')
+            value = (code - origin + self.shift) % 26 + origin
+        else:
+            value = code
+        self[code] = value
+        return value
+
+
+@lru_cache(maxsize=None)
+def _cesar_table(shift):
+    return _CesarTable(shift)
+
+
+def cesar_translate(plaintext, shift):
+    """
+    Chiffrement de César par str.translate.
+
+    Même résultat que cesar_encrypt sur tout texte (lettres non ASCII
+    comprises), sans concaténation caractère par caractère. Pour
+    déchiffrer, passer -shift.
+
+    Paramètres:
+        plaintext (str): Le texte clair à chiffrer
+        shift (int): Le décalage (clé de chiffrement)
+
+    Retourne:
+        str: Le texte chiffré
+    """
+    # La formule ne dépend que de shift modulo 26 : au plus 26 tables
+    return plaintext.translate(_cesar_table(shift % 26))
+
 # === Exemple d'utilisation ===
 if __name__ == "__main__":
     # Texte clair à chiffrer
     plaintext = "Hello, ca va ?"
-    shift = random.randint(0, 25)     # Décalage aléatoire
+    shift = materiel_cles.randbelow(26)     # Décalage aléatoire
     
     print(f"Texte clair: {plaintext}")
     print(f"Clé (décalage): {shift}")
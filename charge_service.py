@@ -0,0 +1,108 @@
+"""
+Test de charge local du service de chiffrement asynchrone.
+
+Lance de nombreuses requêtes simultanées sur CipherService et affiche la
+latence (p50, p99) et le débit, avec et sans regroupement en micro-lots.
+
+Exemple:
+    python charge_service.py --algo xor --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from service_async import CipherService
+
+
+def percentile(values: list, p: float) -> float:
+    """
+    Calcule le p-ième centile d'une liste de valeurs.
+
+    Args:
+        values: Les valeurs mesurées
+        p: Le centile souhaité (entre 0 et 100)
+
+    Returns:
+        La valeur du centile (plus proche rang)
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_request(algo: str, size: int) -> tuple:
+    """
+    Prépare des données et une clé de test pour un algorithme.
+
+    Args:
+        algo: Le nom de l'algorithme
+        size: La taille des données en octets ou caractères
+
+    Returns:
+        Un tuple (données, clé)
+    """
+    if algo == "cesar":
+        return "a" * size, 3
+    if algo == "xor":
+        return os.urandom(size), b"cle_secrete"
+    if algo == "aes_gcm":
+        return os.urandom(size), os.urandom(32)
+    raise ValueError(f"Algorithme non pris en charge par le test de charge: {algo}")
+
+
+async def run_load(service: CipherService, algo: str, size: int,
+                   requests: int, concurrency: int) -> tuple:
+    """
+    Envoie `requests` requêtes avec au plus `concurrency` requêtes simultanées.
+
+    Args:
+        service: Le service à tester
+        algo: Le nom de l'algorithme
+        size: La taille de chaque requête
+        requests: Le nombre total de requêtes
+        concurrency: Le nombre de clients simultanés
+
+    Returns:
+        Un tuple (latences en secondes, durée totale en secondes)
+    """
+    data, key = make_request(algo, size)
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            await service.encrypt(algo, data, key)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def main(args) -> None:
+    print(f"{args.requests} requêtes {args.algo} de {args.size} octets, "
+          f"{args.concurrency} clients simultanés, pool: {args.executor}\n")
+    print(f"{'mode':>14} {'p50 (ms)':>10} {'p99 (ms)':>10} {'req/s':>10}")
+
+    for label, batch_size in (("sans lots", 1), (f"lots de {args.batch_size}", args.batch_size)):
+        async with CipherService(executor=args.executor, batch_size=batch_size,
+                                 max_pending=args.max_pending) as service:
+            latencies, elapsed = await run_load(service, args.algo, args.size,
+                                                args.requests, args.concurrency)
+        print(f"{label:>14} {percentile(latencies, 50) * 1000:>10.2f} "
+              f"{percentile(latencies, 99) * 1000:>10.2f} {args.requests / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge du service asyncio")
+    parser.add_argument("--algo", default="xor", choices=["cesar", "xor", "aes_gcm"])
+    parser.add_argument("--size", type=int, default=256, help="taille d'une requête")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=1024)
+    parser.add_argument("--executor", default="thread", choices=["thread", "process"])
+    asyncio.run(main(parser.parse_args()))
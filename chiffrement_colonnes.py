@@ -0,0 +1,420 @@
+"""
+Chiffrement de colonnes choisies dans des fichiers CSV ou JSONL volumineux.
+
+Seules certaines colonnes sont chiffrées (par exemple les e-mails en
+AES-GCM, les identifiants pseudonymisés par substitution), chacune avec son
+algorithme. Les fonctions de base ne traitent qu'une chaîne à la fois ; ici :
+- le fichier est lu en flux, par lots de lignes ;
+- les lignes sont analysées (csv, json) dans les processus, le processus
+  principal ne fait que lire, découper en lots et écrire ;
+- dans un lot, chaque colonne visée est rassemblée puis traitée d'un bloc :
+  César et substitution par un seul str.translate sur les valeurs jointes,
+  XOR par entiers, AES-GCM avec un contexte AESGCM créé une fois par
+  processus ;
+- les lots sont répartis sur un pool de processus, avec une fenêtre bornée
+  de lots en vol : la mémoire reste constante et l'ordre des lignes est
+  conservé.
+
+En JSONL, seules les valeurs de type chaîne des champs visés sont
+chiffrées (null est conservé, tout autre type est refusé) et les lignes
+vides sont recopiées telles quelles.
+
+Format des valeurs chiffrées :
+- "cesar", "substitution" : texte de même longueur (seules les lettres
+  ASCII sont transformées, les lettres accentuées restent inchangées)
+- "xor" : base64 des octets UTF-8 chiffrés
+- "aes_gcm" : base64 de nonce || chiffré, le nom de la colonne servant de
+  données associées (une valeur ne peut pas être déplacée d'une colonne à
+  une autre)
+
+Les clés sont dérivées d'une phrase de passe (derivation_cles) ; le sel est
+écrit à côté du fichier chiffré, dans `<sortie>.sel`.
+"""
+
+import argparse
+import base64
+import csv
+import getpass
+import io
+import json
+import os
+import string
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import derivation_cles
+import substitution_cypher
+
+ALGORITHMS = ("cesar", "substitution", "xor", "aes_gcm")
+
+# Nombre de lignes par lot, et lots en vol par processus
+BATCH_SIZE = 5000
+WINDOW_PER_WORKER = 2
+
+# Séparateur (US, « unit separator ») utilisé pour joindre les valeurs d'une colonne
+SEPARATOR = "\x1f"
+NONCE_SIZE = 12
+
+# Transformations de colonne du processus courant : {colonne: fonction(valeurs)}
+_worker_state = {}
+
+
+def _translate_column(values: list, table: dict) -> list:
+    """Applique une table de traduction à toute une colonne en un seul appel."""
+    translated = SEPARATOR.join(values).translate(table).split(SEPARATOR)
+    if len(translated) != len(values):
+        # Une valeur contenait le séparateur : traitement valeur par valeur
+        return [value.translate(table) for value in values]
+    return translated
+
+
+def _xor_column(values: list, key: bytes, operation: str) -> list:
+    """Chiffre/déchiffre une colonne en XOR, la clé repartant de 0 pour chaque valeur."""
+    if operation == "encrypt":
+        data = [value.encode('utf-8') for value in values]
+    else:
+        data = [base64.b64decode(value) for value in values]
+
+    longest = max(map(len, data), default=0)
+    keystream = (key * (longest // len(key) + 1))[:longest] if longest else b""
+    results = []
+    for item in data:
+        size = len(item)
+        mixed = (int.from_bytes(item, 'big') ^ int.from_bytes(keystream[:size], 'big')).to_bytes(size, 'big')
+        results.append(base64.b64encode(mixed).decode('ascii') if operation == "encrypt"
+                       else mixed.decode('utf-8'))
+    return results
+
+
+def _aes_gcm_column(aesgcm, aad: bytes, values: list, operation: str) -> list:
+    """Chiffre/déchiffre une colonne en AES-GCM avec un contexte déjà créé."""
+    results = []
+    if operation == "encrypt":
+        for value in values:
+            nonce = os.urandom(NONCE_SIZE)
+            ciphertext = aesgcm.encrypt(nonce, value.encode('utf-8'), aad)
+            results.append(base64.b64encode(nonce + ciphertext).decode('ascii'))
+    else:
+        for value in values:
+            blob = base64.b64decode(value)
+            results.append(aesgcm.decrypt(blob[:NONCE_SIZE], blob[NONCE_SIZE:], aad).decode('utf-8'))
+    return results
+
+
+def _cesar_table(shift: int) -> dict:
+    """Table de traduction du chiffrement de César (lettres ASCII)."""
+    lower, upper = string.ascii_lowercase, string.ascii_uppercase
+    shift %= 26
+    return str.maketrans(lower + upper, lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift])
+
+
+def build_transforms(columns: dict, keys: dict, operation: str) -> dict:
+    """
+    Prépare la transformation de chaque colonne.
+
+    Args:
+        columns: {colonne: algorithme}
+        keys: Les clés renvoyées par derivation_cles.derive_keys
+        operation: "encrypt" ou "decrypt"
+
+    Returns:
+        {colonne: fonction(liste de valeurs) -> liste de valeurs}
+    """
+    transforms = {}
+    for column, algo in columns.items():
+        if algo == "cesar":
+            shift = keys["cesar"] if operation == "encrypt" else -keys["cesar"]
+            table = _cesar_table(shift)
+            transforms[column] = lambda values, table=table: _translate_column(values, table)
+        elif algo == "substitution":
+            mapping = keys["substitution"]
+            if operation == "decrypt":
+                mapping = substitution_cypher.get_reverse_mapping(mapping)
+            table = str.maketrans(mapping)
+            transforms[column] = lambda values, table=table: _translate_column(values, table)
+        elif algo == "xor":
+            transforms[column] = lambda values: _xor_column(values, keys["xor"], operation)
+        elif algo == "aes_gcm":
+            # Import local : la bibliothèque cryptography est optionnelle
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+            aesgcm = AESGCM(keys["aes"])
+            aad = str(column).encode('utf-8')
+            transforms[column] = (lambda values, aesgcm=aesgcm, aad=aad:
+                                  _aes_gcm_column(aesgcm, aad, values, operation))
+        else:
+            raise ValueError(f"Algorithme inconnu: {algo}")
+    return transforms
+
+
+def _init_worker(columns: dict, keys: dict, operation: str) -> None:
+    """Prépare les transformations une fois par processus."""
+    _worker_state["transforms"] = build_transforms(columns, keys, operation)
+
+
+def _process_csv(lines: list) -> str:
+    """Transforme un lot de lignes CSV brutes (colonnes indiquées par leur indice)."""
+    rows = list(csv.reader(lines))
+    for index, transform in _worker_state["transforms"].items():
+        positions = [i for i, row in enumerate(rows) if index < len(row) and row[index]]
+        if not positions:
+            continue
+        values = transform([rows[i][index] for i in positions])
+        for i, value in zip(positions, values):
+            rows[i][index] = value
+
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue()
+
+
+def _process_jsonl(batch: tuple) -> str:
+    """
+    Transforme un lot de lignes JSONL (champs de premier niveau).
+
+    Seules les valeurs de type chaîne sont transformées ; null est laissé
+    tel quel et les lignes vides sont recopiées.
+
+    Args:
+        batch: (numéro de la première ligne du lot, lignes)
+
+    Raises:
+        ValueError: Si une ligne n'est pas un objet JSON, ou si un champ
+                    visé contient un nombre, un booléen, une liste ou un
+                    objet (le type ne survivrait pas au déchiffrement) ;
+                    le message donne le numéro de la ligne
+    """
+    first_line, lines = batch
+    records = {}
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Ligne {first_line + i}: JSON invalide ({error.msg})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Ligne {first_line + i}: un objet JSON est attendu "
+                             f"(valeur de type {type(record).__name__})")
+        records[i] = record
+
+    for field, transform in _worker_state["transforms"].items():
+        positions = [i for i, record in records.items() if record.get(field) is not None]
+        if not positions:
+            continue
+        values = [records[i][field] for i in positions]
+        for i, value in zip(positions, values):
+            if not isinstance(value, str):
+                raise ValueError(f"Ligne {first_line + i}, champ {field!r}: seules les chaînes "
+                                 f"peuvent être chiffrées (valeur de type {type(value).__name__})")
+        for i, value in zip(positions, transform(values)):
+            records[i][field] = value
+    return "".join(json.dumps(records[i], ensure_ascii=False) + "\n" if i in records else line
+                   for i, line in enumerate(lines))
+
+
+def _ordered_map(function, batches, workers: int, initargs: tuple):
+    """
+    Applique function à chaque lot et renvoie les résultats dans l'ordre.
+
+    Au plus WINDOW_PER_WORKER * workers lots sont en vol : la lecture
+    attend que le plus ancien lot soit terminé.
+    """
+    if workers <= 1:
+        _init_worker(*initargs)
+        yield from map(function, batches)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=initargs) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(function, batch))
+            if len(pending) >= WINDOW_PER_WORKER * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _batched(iterator, size: int):
+    """Découpe un itérateur en listes de `size` éléments."""
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_batches(file, size: int):
+    """
+    Découpe un fichier CSV en lots de lignes brutes, analysées dans les processus.
+
+    Un champ entre guillemets peut contenir des retours à la ligne : un lot
+    n'est coupé qu'après une ligne où le nombre total de guillemets est pair.
+    """
+    batch = []
+    quotes = 0
+    for line in file:
+        batch.append(line)
+        quotes += line.count('"')
+        if len(batch) >= size and quotes % 2 == 0:
+            yield batch
+            batch = []
+            quotes = 0
+    if batch:
+        yield batch
+
+
+def transform_file(src: str, dst: str, columns: dict, keys: dict, operation: str = "encrypt",
+                   fmt: str = None, workers: int = None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Chiffre ou déchiffre des colonnes d'un fichier CSV ou JSONL.
+
+    Args:
+        src: Le fichier d'entrée
+        dst: Le fichier de sortie
+        columns: {nom de colonne: algorithme}
+        keys: Les clés renvoyées par derivation_cles.derive_keys
+        operation: "encrypt" ou "decrypt"
+        fmt: "csv" ou "jsonl" (None = d'après l'extension de src)
+        workers: Le nombre de processus (None = nombre de cœurs)
+        batch_size: Le nombre de lignes par lot
+
+    Returns:
+        Le nombre de lots traités
+
+    Raises:
+        ValueError: Si une colonne est absente de l'en-tête CSV, ou si une
+                    ligne JSONL est invalide (voir _process_jsonl)
+    """
+    if fmt is None:
+        fmt = "jsonl" if src.endswith((".jsonl", ".ndjson")) else "csv"
+    if workers is None:
+        workers = os.cpu_count()
+    for algo in columns.values():
+        if algo not in ALGORITHMS:
+            raise ValueError(f"Algorithme inconnu: {algo}")
+
+    count = 0
+    with open(src, newline='', encoding='utf-8') as fin, \
+            open(dst, 'w', newline='', encoding='utf-8') as fout:
+        if fmt == "csv":
+            header_lines = next(_csv_batches(fin, 1), None)
+            if header_lines is None:
+                return 0
+            header = next(csv.reader(header_lines))
+            missing = [name for name in columns if name not in header]
+            if missing:
+                raise ValueError(f"Colonnes absentes de l'en-tête: {', '.join(missing)}")
+            csv.writer(fout).writerow(header)
+            indexed = {header.index(name): algo for name, algo in columns.items()}
+            function, batches, worker_columns = _process_csv, _csv_batches(fin, batch_size), indexed
+        else:
+            batches = ((1 + k * batch_size, lines)
+                       for k, lines in enumerate(_batched(fin, batch_size)))
+            function, worker_columns = _process_jsonl, columns
+
+        for output in _ordered_map(function, batches, workers, (worker_columns, keys, operation)):
+            fout.write(output)
+            count += 1
+    return count
+
+
+def benchmark(rows: int = 200_000, path: str = "/tmp/tp3_colonnes") -> None:
+    """
+    Mesure le débit (Mo/s) selon le nombre de processus sur un CSV généré.
+
+    Args:
+        rows: Le nombre de lignes du fichier de test
+        path: Le préfixe des fichiers temporaires
+    """
+    src, dst = path + ".csv", path + "_chiffre.csv"
+    with open(src, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "nom", "email", "montant"])
+        for i in range(rows):
+            writer.writerow([f"client{i:08d}", f"Nom Prenom {i % 977}",
+                             f"utilisateur.{i}@exemple.fr", f"{(i * 37) % 10000}.00"])
+    size = os.path.getsize(src) / (1 << 20)
+
+    keys = derivation_cles.derive_keys("banc d'essai", b"\x00" * derivation_cles.SALT_SIZE)
+    columns = {"id": "substitution", "nom": "cesar", "email": "xor"}
+
+    print(f"CSV de {rows} lignes ({size:.1f} Mo), colonnes {columns}")
+    print(f"{'processus':>10} {'temps (s)':>10} {'Mo/s':>8}")
+    counts = sorted({1, 2, 4, os.cpu_count()})
+    for workers in counts:
+        start = time.perf_counter()
+        transform_file(src, dst, columns, keys, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>10} {elapsed:>10.2f} {size / elapsed:>8.1f}")
+
+    transform_file(dst, src + ".dechiffre", columns, keys, "decrypt")
+    with open(src, 'rb') as a, open(src + ".dechiffre", 'rb') as b:
+        print(f"Déchiffrement identique: {a.read() == b.read()}")
+    for file in (src, dst, src + ".dechiffre"):
+        os.remove(file)
+
+
+def _parse_column(spec: str) -> tuple:
+    """Lit une option --colonne nom=algorithme."""
+    name, _, algo = spec.rpartition("=")
+    if not name or algo not in ALGORITHMS:
+        raise argparse.ArgumentTypeError(
+            f"attendu nom=algorithme avec algorithme parmi {', '.join(ALGORITHMS)}")
+    return name, algo
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Chiffrement de colonnes CSV/JSONL")
+    parser.add_argument("entree", nargs="?", help="Fichier d'entrée (.csv ou .jsonl)")
+    parser.add_argument("sortie", nargs="?", help="Fichier de sortie")
+    parser.add_argument("-c", "--colonne", action="append", type=_parse_column, default=[],
+                        help="Colonne à traiter, sous la forme nom=algorithme (répétable)")
+    parser.add_argument("-d", "--decrypt", action="store_true", help="Déchiffrer")
+    parser.add_argument("--passphrase", help="Phrase de passe (demandée si absente)")
+    parser.add_argument("--sel", help="Sel en hexadécimal (par défaut: fichier .sel)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Format (d'après l'extension par défaut)")
+    parser.add_argument("--workers", type=int, help="Nombre de processus")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Lignes par lot")
+    parser.add_argument("--benchmark", action="store_true", help="Mesurer le débit")
+    arguments = parser.parse_args(argv)
+
+    if arguments.benchmark:
+        benchmark()
+        return 0
+    if not arguments.entree or not arguments.sortie or not arguments.colonne:
+        parser.error("entree, sortie et au moins une --colonne sont requis")
+
+    passphrase = arguments.passphrase or getpass.getpass("Phrase de passe: ")
+    if arguments.sel:
+        salt = bytes.fromhex(arguments.sel)
+    elif arguments.decrypt:
+        salt_path = arguments.entree + ".sel"
+        if not os.path.exists(salt_path):
+            print(f"Sel introuvable: {salt_path} (utiliser --sel)", file=sys.stderr)
+            return 1
+        with open(salt_path) as f:
+            salt = bytes.fromhex(f.read().strip())
+    else:
+        salt = derivation_cles.new_salt()
+    if not arguments.decrypt:
+        with open(arguments.sortie + ".sel", 'w') as f:
+            f.write(salt.hex() + "\n")
+
+    keys = derivation_cles.derive_keys(passphrase, salt)
+    start = time.perf_counter()
+    batches = transform_file(arguments.entree, arguments.sortie, dict(arguments.colonne), keys,
+                             "decrypt" if arguments.decrypt else "encrypt",
+                             arguments.format, arguments.workers, arguments.batch_size)
+    print(f"{batches} lots traités en {time.perf_counter() - start:.2f} s -> {arguments.sortie}")
+    return 0
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    sys.exit(main())
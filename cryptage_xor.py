@@ -37,6 +37,29 @@ def xor_decrypt(ciphertext_bytes: bytes, key_bytes: bytes) -> bytes:
     return xor_encrypt(ciphertext_bytes, key_bytes)
 
 
+def xor_encrypt_int(plaintext_bytes: bytes, key_bytes: bytes) -> bytes:
+    """
+    Chiffre (ou déchiffre) en XOR avec une clé répétée, sur des entiers.
+
+    Même résultat que xor_encrypt, y compris les erreurs (clé vide pour un
+    message non vide), mais le XOR porte sur deux grands entiers au lieu
+    d'une boucle octet par octet.
+
+    Args:
+        plaintext_bytes: Les octets à chiffrer
+        key_bytes: La clé de chiffrement (sera répétée si nécessaire)
+
+    Returns:
+        Les octets chiffrés
+    """
+    size = len(plaintext_bytes)
+    if size == 0:
+        return b""
+    keystream = (key_bytes * (size // len(key_bytes) + 1))[:size]
+    value = int.from_bytes(plaintext_bytes, 'big') ^ int.from_bytes(keystream, 'big')
+    return value.to_bytes(size, 'big')
+
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     # Message à chiffrer
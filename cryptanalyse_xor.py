@@ -0,0 +1,288 @@
+"""
+Cryptanalyse du chiffrement XOR à clé répétée (type Vigenère).
+
+`cryptage_xor.xor_encrypt` répète la clé de façon cyclique : l'octet i du
+message est combiné avec key[i % len(key)]. L'attaque se fait en deux temps :
+
+1. Détection de la longueur de clé : pour chaque longueur candidate k, on
+   calcule la distance de Hamming normalisée entre le texte chiffré et
+   lui-même décalé de k octets. Lorsque k est un multiple de la longueur de
+   clé, la clé s'annule (c[i] ^ c[i+k] = p[i] ^ p[i+k]) et la distance chute.
+2. Résolution colonne par colonne : en transposant le texte chiffré en k
+   colonnes, chaque colonne est un XOR à un seul octet, cassé par analyse
+   de fréquence.
+
+NumPy est utilisé s'il est installé (table de popcount), sinon un chemin
+en Python pur équivalent est employé. L'histogramme des colonnes et les
+scores des clés viennent de statistiques_frequences, avec la table des
+fréquences du français.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cryptage_xor
+# BYTE_WEIGHTS et FRENCH_FREQUENCIES restent importables depuis ce module
+from statistiques_frequences import BYTE_WEIGHTS, FRENCH_FREQUENCIES, FrequencyStats  # noqa: F401
+
+# NumPy est optionnel : accélère le calcul des distances et des scores
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Seuil (en octets) à partir duquel les colonnes sont résolues en parallèle
+PARALLEL_THRESHOLD = 1 << 20
+
+# Choix de la longueur de clé : nombre de longueurs retenues d'après la
+# distance de Hamming, taille de l'échantillon résolu pour chacune, taille
+# en dessous de laquelle toutes les longueurs sont essayées et pénalité
+# (log-vraisemblance) par octet de clé
+CANDIDATE_LENGTHS = 5
+SAMPLE_SIZE = 1 << 14
+SMALL_TEXT_SIZE = 1024
+KEY_BYTE_PENALTY = math.log(256)
+
+# Table de popcount : nombre de bits à 1 pour chaque valeur d'octet
+POPCOUNT = bytes(bin(i).count('1') for i in range(256))
+
+if NUMPY_AVAILABLE:
+    _POPCOUNT_NP = np.frombuffer(POPCOUNT, dtype=np.uint8)
+
+
+def hamming_distance(a: bytes, b: bytes) -> int:
+    """
+    Calcule la distance de Hamming (nombre de bits différents) entre deux
+    suites d'octets de même longueur.
+
+    Args:
+        a: Première suite d'octets
+        b: Deuxième suite d'octets
+
+    Returns:
+        Le nombre de bits qui diffèrent
+
+    Raises:
+        ValueError: Si les deux suites n'ont pas la même longueur
+    """
+    if len(a) != len(b):
+        raise ValueError("Les deux suites doivent avoir la même longueur")
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).bit_count()
+
+
+def key_length_scores(ciphertext: bytes, max_key_length: int = 40,
+                      sample_size: int = 1 << 16) -> dict:
+    """
+    Calcule la distance de Hamming normalisée pour chaque longueur de clé.
+
+    Pour une longueur k, on compare c[i] et c[i+k] sur tout l'échantillon :
+    le score est la proportion de bits qui diffèrent (entre 0 et 1).
+
+    Args:
+        ciphertext: Le texte chiffré
+        max_key_length: La plus grande longueur de clé testée
+        sample_size: Nombre d'octets analysés (le début du texte suffit)
+
+    Returns:
+        Un dictionnaire {longueur: distance normalisée}
+    """
+    sample = ciphertext[:sample_size + max_key_length]
+    max_key_length = min(max_key_length, len(sample) - 1)
+    scores = {}
+
+    if NUMPY_AVAILABLE:
+        data = np.frombuffer(sample, dtype=np.uint8)
+        for k in range(1, max_key_length + 1):
+            diff = _POPCOUNT_NP[data[:-k] ^ data[k:]]
+            scores[k] = int(diff.sum(dtype=np.int64)) / (8 * diff.size)
+    else:
+        for k in range(1, max_key_length + 1):
+            distance = hamming_distance(sample[:-k], sample[k:])
+            scores[k] = distance / (8 * (len(sample) - k))
+
+    return scores
+
+
+def candidate_key_lengths(ciphertext: bytes, max_key_length: int = 40) -> list:
+    """
+    Renvoie les longueurs de clé à essayer : les CANDIDATE_LENGTHS meilleures
+    selon la distance de Hamming, et tous leurs diviseurs.
+
+    Avec une clé courte en ASCII, les octets de clé se ressemblent et l'écart
+    de distance entre les décalages est faible : la vraie longueur n'est pas
+    toujours la meilleure, mais elle figure parmi les premières ou divise
+    l'une d'elles.
+
+    Args:
+        ciphertext: Le texte chiffré
+        max_key_length: La plus grande longueur de clé testée
+
+    Returns:
+        Les longueurs candidates, dans l'ordre croissant
+    """
+    if len(ciphertext) <= SMALL_TEXT_SIZE:
+        # Distances trop bruitées sur un texte court, mais toutes les
+        # longueurs se résolvent rapidement
+        return list(range(1, max(1, min(max_key_length, len(ciphertext))) + 1))
+    scores = key_length_scores(ciphertext, max_key_length)
+    candidates = {1}
+    for k in sorted(scores, key=scores.get)[:CANDIDATE_LENGTHS]:
+        candidates.update(d for d in range(1, k + 1) if k % d == 0)
+    return sorted(candidates)
+
+
+def guess_key_length(ciphertext: bytes, max_key_length: int = 40) -> int:
+    """
+    Devine la longueur de la clé.
+
+    Chaque longueur candidate est résolue colonne par colonne sur un
+    échantillon, et notée par la log-vraisemblance du texte déchiffré
+    (FrequencyStats). Les multiples de la vraie longueur obtiennent un score
+    au moins aussi bon (plus de liberté) : chaque octet de clé est donc
+    pénalisé de ln(256), le coût de sa description, et la longueur de
+    meilleur score pénalisé est retenue.
+
+    Args:
+        ciphertext: Le texte chiffré
+        max_key_length: La plus grande longueur de clé testée
+
+    Returns:
+        La longueur de clé la plus probable
+    """
+    sample = ciphertext[:SAMPLE_SIZE]
+    if not sample:
+        return 1
+    scores = {k: _solve_columns(sample, k)[1] - k * KEY_BYTE_PENALTY
+              for k in candidate_key_lengths(sample, max_key_length)}
+    return max(sorted(scores), key=scores.get)
+
+
+def solve_single_byte_xor(column: bytes) -> tuple:
+    """
+    Retrouve l'octet de clé d'une colonne chiffrée par XOR à un seul octet.
+
+    L'histogramme de la colonne est calculé une seule fois ; pour une clé k,
+    l'histogramme du texte clair s'obtient en permutant celui-ci (b -> b ^ k).
+    Les 256 candidats sont ainsi notés sans redéchiffrer la colonne.
+
+    Args:
+        column: Les octets de la colonne
+
+    Returns:
+        Un tuple (octet_de_clé, score) où le score est la log-vraisemblance
+    """
+    stats = FrequencyStats("bytes", orders=(1,))
+    stats.update(column)
+    scores = stats.xor_key_scores()
+    best = max(range(256), key=scores.__getitem__)
+    return best, scores[best]
+
+
+def _solve_column_key(column: bytes) -> tuple:
+    """Résout une colonne (utilisé par le pool de processus)."""
+    return solve_single_byte_xor(column)
+
+
+def _solve_columns(ciphertext: bytes, key_length: int, workers: int = 1) -> tuple:
+    """
+    Résout toutes les colonnes pour une longueur de clé.
+
+    Returns:
+        Un tuple (clé, score) où le score est la log-vraisemblance totale
+        du texte déchiffré
+    """
+    # Transposition : la colonne j contient les octets chiffrés par key[j]
+    columns = [ciphertext[j::key_length] for j in range(key_length)]
+    if workers > 1 and key_length > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, key_length)) as pool:
+            solved = list(pool.map(_solve_column_key, columns))
+    else:
+        solved = [_solve_column_key(column) for column in columns]
+    return bytes(k for k, _ in solved), sum(score for _, score in solved)
+
+
+def break_repeating_key_xor(ciphertext: bytes, max_key_length: int = 40,
+                            key_length: int = None, workers: int = None) -> tuple:
+    """
+    Casse un chiffrement XOR à clé répétée.
+
+    Args:
+        ciphertext: Le texte chiffré
+        max_key_length: La plus grande longueur de clé testée
+        key_length: Longueur de clé connue (sinon elle est devinée)
+        workers: Nombre de processus pour résoudre les colonnes. Par défaut,
+                 un pool n'est utilisé que pour les textes d'au moins
+                 PARALLEL_THRESHOLD octets ; 1 force le mode séquentiel.
+
+    Returns:
+        Un tuple (clé, texte_clair) en octets
+    """
+    if not ciphertext:
+        return b"", b""
+    if key_length is None:
+        key_length = guess_key_length(ciphertext, max_key_length)
+
+    if workers is None:
+        workers = os.cpu_count() if len(ciphertext) >= PARALLEL_THRESHOLD else 1
+    key, _ = _solve_columns(ciphertext, key_length, workers)
+
+    return key, cryptage_xor.xor_decrypt(ciphertext, key)
+
+
+def benchmark(size: int = 1 << 20, key: bytes = b"cle_secrete") -> None:
+    """
+    Mesure le temps de l'attaque complète sur un texte chiffré de `size`
+    octets et affiche le résultat.
+
+    Args:
+        size: Taille du texte chiffré en octets (1 Mo par défaut)
+        key: La clé utilisée pour chiffrer le texte de test
+    """
+    sample = ("Bonjour, ceci est un message secret. Les données de ce "
+              "journal ont été chiffrées avec une clé répétée, ce qui "
+              "permet de les retrouver par analyse de fréquence.\n")
+    plaintext = (sample.encode('utf-8') * (size // len(sample) + 1))[:size]
+    ciphertext = cryptage_xor.xor_encrypt(plaintext, key)
+
+    backend = "numpy" if NUMPY_AVAILABLE else "python"
+    print(f"Benchmark ({backend}) sur {size / (1 << 20):.1f} Mo")
+
+    start = time.perf_counter()
+    key_length = guess_key_length(ciphertext)
+    detection = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found_key, recovered = break_repeating_key_xor(ciphertext, key_length=key_length)
+    solving = time.perf_counter() - start
+
+    print(f"  Longueur de clé détectée : {key_length} ({detection * 1000:.1f} ms)")
+    print(f"  Clé retrouvée            : {found_key!r} ({solving * 1000:.1f} ms)")
+    print(f"  Texte correct            : {recovered == plaintext}")
+
+    # Clés courtes en ASCII : peu d'écart de distance de Hamming entre les longueurs
+    for short_key in (b"ab", b"xyz", b"cle"):
+        found_key, recovered = break_repeating_key_xor(cryptage_xor.xor_encrypt(plaintext, short_key))
+        print(f"  Clé courte {short_key!r:8}: retrouvée {found_key!r}, "
+              f"texte correct {recovered == plaintext}")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    message = ("Bonjour, ceci est un message secret! Il est assez long pour "
+               "que l'analyse de fréquence puisse retrouver la clé utilisée "
+               "lors du chiffrement XOR, colonne par colonne.")
+    key = b"cle_secrete"
+
+    encrypted = cryptage_xor.xor_encrypt(message.encode('utf-8'), key)
+    print(f"Message chiffré (hex): {encrypted.hex()[:64]}...")
+
+    found_key, recovered = break_repeating_key_xor(encrypted)
+    print(f"Clé retrouvée: {found_key!r}")
+    print(f"Message retrouvé: {recovered.decode('utf-8', errors='replace')}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
@@ -0,0 +1,451 @@
+"""
+Démon de chiffrement local, accessible par une socket Unix.
+
+Chaque `python main.py` paie le démarrage de l'interpréteur, les imports et
+la génération des clés RSA. Le démon garde un état chaud :
+- contextes AESGCM en cache (un par clé, les plus récents) ;
+- clés RSA chargées depuis le stockage (stockage_cles_rsa), sous forme CRT ;
+- réserve de paires RSA pré-générées par un thread d'arrière-plan ;
+- pool de processus déjà démarré pour les gros messages.
+
+Protocole (entiers en big-endian), une trame par requête et par réponse :
+    trame   = longueur (4 octets) | contenu
+    requête = opération (1) | algorithme (1) | longueur clé (2) | clé | données
+    réponse = statut (1 : 0 = succès, 1 = erreur) | données ou message d'erreur
+Une trame annoncée plus longue que MAX_FRAME fait fermer la connexion.
+
+Clés selon l'algorithme :
+- "cesar" : décalage en ASCII (ex. b"3"), données = texte UTF-8
+- "xor" : octets bruts
+- "aes_gcm" : 16, 24 ou 32 octets ; chiffrer renvoie nonce (12) || chiffré
+- "feistel" : b"K1:K2" (chaînes binaires), données = texte latin-1
+- "rsa" : identifiant de clé (16 octets) ; l'opération "rsa_keygen"
+  renvoie l'identifiant d'une nouvelle paire prise dans la réserve
+
+Exemple:
+    python daemon_chiffrement.py --socket /tmp/tp3.sock
+    python main.py client --socket /tmp/tp3.sock --algo xor --key cle "Bonjour"
+"""
+
+import argparse
+import os
+import queue
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import cesar_cypher
+import cryptage_xor
+import feistel_block_cypher_cryptage
+import RSA
+import stockage_cles_rsa
+
+DEFAULT_SOCKET = "/tmp/tp3_chiffrement.sock"
+# Stockage propre au démon : main.py écrit dans "cles_rsa" sans verrou
+# partagé avec ce processus
+DEFAULT_KEYSTORE = "cles_rsa_daemon"
+
+FRAME = struct.Struct(">I")
+# Taille maximale d'une trame : la longueur annoncée par le client n'est pas
+# allouée au-delà
+MAX_FRAME = 64 << 20
+REQUEST = struct.Struct(">BBH")
+
+OPERATIONS = {"ping": 0, "encrypt": 1, "decrypt": 2, "rsa_keygen": 3}
+ALGORITHMS = {"none": 0, "cesar": 1, "xor": 2, "aes_gcm": 3, "rsa": 4, "feistel": 5}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Taille à partir de laquelle une requête est envoyée au pool de processus
+POOL_THRESHOLD = 1 << 16
+# Nombre maximal de contextes AESGCM gardés en cache
+AES_CACHE_SIZE = 256
+NONCE_SIZE = 12
+# Attente maximale d'une paire de la réserve avant de la générer directement
+KEY_POOL_TIMEOUT = 5.0
+# Pause avant de relancer une génération de la réserve qui a échoué
+KEYGEN_RETRY_DELAY = 1.0
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Lit exactement `size` octets (renvoie b"" si la connexion est fermée avant)."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return b""
+        data += chunk
+    return bytes(data)
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    """Envoie une trame préfixée par sa longueur."""
+    sock.sendall(FRAME.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket, max_size: int = MAX_FRAME):
+    """
+    Reçoit une trame ; renvoie None si la connexion est fermée ou si la
+    longueur annoncée dépasse max_size (la connexion doit alors être fermée).
+    """
+    header = _recv_exact(sock, FRAME.size)
+    if not header:
+        return None
+    (length,) = FRAME.unpack(header)
+    if length > max_size:
+        return None
+    payload = _recv_exact(sock, length)
+    if len(payload) != length:
+        return None
+    return payload
+
+
+def _run_symmetric(algo: str, operation: str, key: bytes, data: bytes) -> bytes:
+    """Opérations sans état sur les algorithmes symétriques (aussi exécuté dans le pool)."""
+    encrypt = operation == "encrypt"
+    if algo == "xor":
+        return cryptage_xor.xor_encrypt_int(data, key)
+    if algo == "cesar":
+        shift = int(key.decode('ascii'))
+        return cesar_cypher.cesar_translate(data.decode('utf-8'), shift if encrypt else -shift).encode('utf-8')
+    if algo == "feistel":
+        key1, key2 = key.decode('ascii').split(":")
+        function = (feistel_block_cypher_cryptage.feistel_encrypt_int if encrypt
+                    else feistel_block_cypher_cryptage.feistel_decrypt)
+        return function(data.decode('latin-1'), key1, key2).encode('latin-1')
+    raise ValueError(f"Algorithme non géré: {algo}")
+
+
+def _run_rsa(operation: str, key: tuple, data: bytes) -> bytes:
+    """Chiffrement/déchiffrement RSA (exécuté dans le pool pour les gros messages)."""
+    if operation == "encrypt":
+        return RSA.rsa_encrypt_bytes(data, key, workers=1)
+    return RSA.rsa_decrypt_bytes(data, key, workers=1)
+
+
+class CipherDaemon:
+    """
+    État chaud partagé par toutes les connexions du démon.
+    """
+
+    def __init__(self, keystore_path: str = DEFAULT_KEYSTORE, keysize: int = 2048,
+                 pool_size: int = 4, workers: int = None):
+        """
+        Args:
+            keystore_path: Le chemin du stockage de clés RSA (sans extension)
+            keysize: La taille des clés RSA pré-générées
+            pool_size: Le nombre de paires RSA gardées en réserve
+            workers: La taille du pool de processus (None = un par cœur)
+        """
+        self.keysize = keysize
+        self.store = stockage_cles_rsa.KeyStore(keystore_path)
+        self._store_lock = threading.Lock()
+        self._rsa_keys = {}
+        self._aes_contexts = OrderedDict()
+        self._aes_lock = threading.Lock()
+
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Démarrer les processus tout de suite plutôt qu'à la première requête
+        self.executor.submit(int).result()
+
+        self._key_pool = queue.Queue(maxsize=pool_size)
+        self._stopping = threading.Event()
+        self._pool_thread = threading.Thread(target=self._fill_key_pool, daemon=True)
+        self._pool_thread.start()
+
+    def _fill_key_pool(self) -> None:
+        """Génère des paires RSA en arrière-plan pour garder la réserve pleine."""
+        while not self._stopping.is_set():
+            try:
+                keys = self.executor.submit(RSA.rsa_keygen, self.keysize, True).result()
+            except Exception as error:
+                if self._stopping.is_set():
+                    return
+                print(f"Génération de la réserve RSA échouée: {error!r}",
+                      file=sys.stderr, flush=True)
+                self._stopping.wait(KEYGEN_RETRY_DELAY)
+                continue
+            while not self._stopping.is_set():
+                try:
+                    self._key_pool.put(keys, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def new_rsa_key(self) -> bytes:
+        """
+        Prend une paire dans la réserve, l'enregistre et renvoie son identifiant.
+
+        Si la réserve reste vide KEY_POOL_TIMEOUT secondes (thread en retard
+        ou en échec), la paire est générée directement.
+        """
+        try:
+            public_key, private_key = self._key_pool.get(timeout=KEY_POOL_TIMEOUT)
+        except queue.Empty:
+            keygen = self.executor.submit(RSA.rsa_keygen, self.keysize, True)
+            public_key, private_key = keygen.result()
+        with self._store_lock:
+            kid = self.store.put(public_key, private_key)
+        self._rsa_keys[kid] = (public_key, private_key)
+        return kid
+
+    def _rsa_key(self, kid: bytes) -> tuple:
+        """Renvoie la paire RSA d'un identifiant (chargée une seule fois)."""
+        if kid not in self._rsa_keys:
+            with self._store_lock:
+                self._rsa_keys[kid] = self.store.get(kid)
+        return self._rsa_keys[kid]
+
+    def _aes_context(self, key: bytes):
+        """Renvoie le contexte AESGCM d'une clé (cache LRU)."""
+        with self._aes_lock:
+            if key in self._aes_contexts:
+                self._aes_contexts.move_to_end(key)
+                return self._aes_contexts[key]
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        context = AESGCM(key)
+        with self._aes_lock:
+            self._aes_contexts[key] = context
+            if len(self._aes_contexts) > AES_CACHE_SIZE:
+                self._aes_contexts.popitem(last=False)
+        return context
+
+    def handle(self, operation: str, algo: str, key: bytes, data: bytes) -> bytes:
+        """
+        Traite une requête décodée.
+
+        Returns:
+            Les données de la réponse
+
+        Raises:
+            ValueError: Si la requête est invalide
+        """
+        if operation == "ping":
+            return b"pong"
+        if operation == "rsa_keygen":
+            return self.new_rsa_key()
+
+        if algo == "aes_gcm":
+            context = self._aes_context(key)
+            if operation == "encrypt":
+                nonce = os.urandom(NONCE_SIZE)
+                return nonce + context.encrypt(nonce, data, b"")
+            from cryptography.exceptions import InvalidTag
+            try:
+                return context.decrypt(data[:NONCE_SIZE], data[NONCE_SIZE:], b"")
+            except InvalidTag:
+                # str(InvalidTag()) est vide
+                raise ValueError("Authentification AES-GCM échouée "
+                                 "(clé incorrecte ou données modifiées)") from None
+
+        if algo == "rsa":
+            public_key, private_key = self._rsa_key(key)
+            if operation == "decrypt" and private_key is None:
+                raise ValueError("Clé privée inconnue pour cet identifiant")
+            rsa_key = public_key if operation == "encrypt" else private_key
+            if len(data) >= POOL_THRESHOLD:
+                return self.executor.submit(_run_rsa, operation, rsa_key, data).result()
+            return _run_rsa(operation, rsa_key, data)
+
+        if len(data) >= POOL_THRESHOLD:
+            return self.executor.submit(_run_symmetric, algo, operation, key, data).result()
+        return _run_symmetric(algo, operation, key, data)
+
+    def close(self) -> None:
+        """Arrête le thread de réserve, le pool et ferme le stockage."""
+        self._stopping.set()
+        self._pool_thread.join()
+        self.executor.shutdown(wait=True)
+        self.store.close()
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Traite les requêtes d'une connexion jusqu'à sa fermeture."""
+
+    def handle(self):
+        operations = {v: k for k, v in OPERATIONS.items()}
+        algorithms = {v: k for k, v in ALGORITHMS.items()}
+        while True:
+            payload = recv_frame(self.request)
+            if payload is None:
+                return
+            try:
+                op_id, algo_id, key_length = REQUEST.unpack_from(payload)
+                key = payload[REQUEST.size:REQUEST.size + key_length]
+                data = payload[REQUEST.size + key_length:]
+                if op_id not in operations or algo_id not in algorithms:
+                    raise ValueError("Opération ou algorithme inconnu")
+                result = self.server.daemon_state.handle(
+                    operations[op_id], algorithms[algo_id], key, data)
+                response = bytes([STATUS_OK]) + result
+            except Exception as error:
+                message = str(error) or type(error).__name__
+                response = bytes([STATUS_ERROR]) + message.encode('utf-8')
+            send_frame(self.request, response)
+
+
+class CipherServer(socketserver.ThreadingUnixStreamServer):
+    """Serveur du démon : un thread par connexion."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon_state: CipherDaemon):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        self.daemon_state = daemon_state
+
+
+class CipherClient:
+    """
+    Client du démon (connexion persistante).
+
+    Exemple:
+        with CipherClient("/tmp/tp3.sock") as client:
+            chiffre = client.encrypt("xor", b"cle", b"Bonjour")
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+
+    def request(self, operation: str, algo: str = "none", key: bytes = b"", data: bytes = b"") -> bytes:
+        """
+        Envoie une requête et attend la réponse.
+
+        Raises:
+            ValueError: Si le démon renvoie une erreur
+            ConnectionError: Si le démon ferme la connexion
+        """
+        send_frame(self.sock, REQUEST.pack(OPERATIONS[operation], ALGORITHMS[algo], len(key))
+                   + key + data)
+        response = recv_frame(self.sock)
+        if response is None:
+            raise ConnectionError("Connexion fermée par le démon")
+        if response[0] != STATUS_OK:
+            raise ValueError(response[1:].decode('utf-8'))
+        return response[1:]
+
+    def encrypt(self, algo: str, key: bytes, data: bytes) -> bytes:
+        """Chiffre des données (voir l'en-tête du module pour le format des clés)."""
+        return self.request("encrypt", algo, key, data)
+
+    def decrypt(self, algo: str, key: bytes, data: bytes) -> bytes:
+        """Déchiffre des données."""
+        return self.request("decrypt", algo, key, data)
+
+    def new_rsa_key(self) -> bytes:
+        """Demande une nouvelle paire RSA et renvoie son identifiant."""
+        return self.request("rsa_keygen")
+
+    def ping(self) -> bool:
+        """Vérifie que le démon répond."""
+        return self.request("ping") == b"pong"
+
+    def close(self) -> None:
+        """Ferme la connexion."""
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _interrupt(signum, frame):
+    """Transforme SIGTERM en KeyboardInterrupt pour un arrêt propre."""
+    raise KeyboardInterrupt
+
+
+def serve(socket_path: str = DEFAULT_SOCKET, **options) -> None:
+    """
+    Lance le démon jusqu'à interruption (Ctrl+C ou SIGTERM).
+
+    Args:
+        socket_path: Le chemin de la socket Unix
+        **options: Les options de CipherDaemon
+    """
+    state = CipherDaemon(**options)
+    # Après la création du pool : les processus forkés gardent le
+    # comportement par défaut de SIGTERM
+    signal.signal(signal.SIGTERM, _interrupt)
+    with CipherServer(socket_path, state) as server:
+        print(f"Démon de chiffrement à l'écoute sur {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nArrêt du démon")
+        finally:
+            state.close()
+            os.unlink(socket_path)
+
+
+def benchmark(keysize: int = 2048, rounds: int = 200) -> None:
+    """
+    Compare une invocation à froid (nouvel interpréteur, imports, génération
+    de clé) à un aller-retour vers le démon déjà chaud.
+
+    Args:
+        keysize: La taille de clé RSA
+        rounds: Le nombre d'allers-retours mesurés
+    """
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, "tp3.sock")
+    state = CipherDaemon(os.path.join(directory, "cles"), keysize=keysize, pool_size=2)
+    server = CipherServer(socket_path, state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    cold_scripts = {
+        "xor": "import cryptage_xor; cryptage_xor.xor_encrypt(b'Bonjour', b'cle')",
+        "rsa": (f"import RSA; pub, _ = RSA.rsa_keygen({keysize}); "
+                "RSA.rsa_encrypt_bytes(b'Bonjour', pub)"),
+    }
+
+    try:
+        with CipherClient(socket_path) as client:
+            kid = client.new_rsa_key()
+            print(f"{'opération':>10} {'CLI à froid (ms)':>17} {'démon (ms)':>11}")
+            for algo, script in cold_scripts.items():
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", script], cwd=here, check=True)
+                cold = time.perf_counter() - start
+
+                key = kid if algo == "rsa" else b"cle"
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    client.encrypt(algo, key, b"Bonjour")
+                warm = (time.perf_counter() - start) / rounds
+                print(f"{algo:>10} {cold * 1000:>17.1f} {warm * 1000:>11.3f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+        state.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démon de chiffrement (socket Unix)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--keystore", default=DEFAULT_KEYSTORE)
+    parser.add_argument("--keysize", type=int, default=2048)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare une invocation à froid à un aller-retour vers le démon")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.keysize)
+    else:
+        serve(args.socket, keystore_path=args.keystore, keysize=args.keysize,
+              pool_size=args.pool_size)
@@ -0,0 +1,309 @@
+"""
+Dérivation de clés à partir d'une phrase de passe (scrypt ou PBKDF2-HMAC).
+
+Jusqu'ici les clés sont tirées au hasard à chaque exécution (AES-GCM,
+Feistel) ou tapées directement (XOR) : rien ne peut être déchiffré plus
+tard à partir d'une simple phrase de passe. Ce module dérive de la phrase
+de passe et d'un sel une clé maîtresse, puis, par HMAC-SHA256 avec une
+étiquette par usage, une clé pour chaque algorithme :
+- "aes" : 32 octets (AES-256)
+- "xor" : octets de la longueur demandée
+- "feistel" : (K1, K2) en chaînes binaires
+- "cesar" : décalage entre 1 et 25
+- "substitution" : table de substitution (mapping des 52 lettres)
+
+Les fonctions de dérivation sont volontairement lentes (~50 ms et plus). Un
+cache LRU en mémoire garde les clés maîtresses déjà dérivées, avec une
+durée de vie (TTL) et une taille bornées ; une entrée évincée ou expirée
+est remise à zéro. Le cache est indexé par une empreinte de (phrase, sel,
+paramètres), jamais par la phrase de passe elle-même.
+"""
+
+import hashlib
+import hmac
+import string
+import threading
+import time
+from collections import OrderedDict
+
+import materiel_cles
+
+# Paramètres par défaut (recommandations OWASP)
+SCRYPT_PARAMS = {"n": 1 << 14, "r": 8, "p": 1}
+PBKDF2_ITERATIONS = 600_000
+MASTER_KEY_SIZE = 32
+SALT_SIZE = 16
+
+
+def new_salt() -> bytes:
+    """
+    Tire un sel aléatoire, à conserver avec les données chiffrées.
+
+    Returns:
+        Un sel de SALT_SIZE octets
+    """
+    return materiel_cles.token_bytes(SALT_SIZE)
+
+
+def _kdf(passphrase: bytes, salt: bytes, method: str, params: dict) -> bytes:
+    """Exécute la fonction de dérivation lente."""
+    if method == "scrypt":
+        return hashlib.scrypt(passphrase, salt=salt, dklen=MASTER_KEY_SIZE,
+                              maxmem=256 * params["n"] * params["r"] + (1 << 20), **params)
+    if method == "pbkdf2":
+        return hashlib.pbkdf2_hmac("sha256", passphrase, salt, params["iterations"],
+                                   MASTER_KEY_SIZE)
+    raise ValueError(f"Méthode de dérivation inconnue: {method}")
+
+
+def expand(master_key: bytes, label: str, length: int) -> bytes:
+    """
+    Dérive une sous-clé d'une clé maîtresse (HKDF-Expand, RFC 5869).
+
+    Args:
+        master_key: La clé maîtresse
+        label: L'usage de la sous-clé (deux usages différents donnent des
+               clés indépendantes)
+        length: La longueur voulue en octets (au plus 255 blocs de 32
+                octets ; au-delà, utiliser _DerivedStream)
+
+    Returns:
+        La sous-clé
+
+    Raises:
+        ValueError: Si la longueur dépasse 255 * 32 octets
+    """
+    if length > 255 * hashlib.sha256().digest_size:
+        raise ValueError("HKDF-Expand est limité à 255 blocs (8160 octets)")
+    output = b""
+    block = b""
+    counter = 1
+    while len(output) < length:
+        block = hmac.new(master_key, block + label.encode('utf-8') + bytes([counter]),
+                         hashlib.sha256).digest()
+        output += block
+        counter += 1
+    return output[:length]
+
+
+class _DerivedStream(materiel_cles.KeyMaterialPool):
+    """
+    Flux d'octets déterministe tiré d'une sous-clé.
+
+    Réutilise les tirages sans biais de KeyMaterialPool (randbelow, shuffle)
+    en remplaçant seulement la source d'octets.
+    """
+
+    def __init__(self, master_key: bytes, label: str):
+        super().__init__()
+        self._master_key = master_key
+        self._label = label
+        self._counter = 0
+
+    def token_bytes(self, n: int) -> bytes:
+        output = b""
+        while len(output) < n:
+            self._counter += 1
+            output += expand(self._master_key, f"{self._label}/{self._counter}", 32)
+        return output[:n]
+
+
+class DerivedKeyCache:
+    """
+    Cache LRU des clés maîtresses dérivées, avec TTL et remise à zéro.
+
+    Les clés sont gardées dans des bytearray, écrasés par des zéros à
+    l'éviction ; les entrées expirées sont purgées à chaque ajout. Python
+    peut garder d'autres copies en mémoire (bytes intermédiaires) : la
+    remise à zéro limite l'exposition sans la garantir.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl: float = 300.0):
+        """
+        Args:
+            max_entries: Le nombre maximal de clés gardées
+            ttl: La durée de vie d'une entrée en secondes
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # empreinte -> (clé, date d'expiration)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _zeroize(buffer: bytearray) -> None:
+        buffer[:] = bytes(len(buffer))
+
+    def get(self, fingerprint: bytes):
+        """
+        Renvoie la clé associée à une empreinte, ou None (absente ou expirée).
+
+        Args:
+            fingerprint: L'empreinte de (phrase, sel, paramètres)
+
+        Returns:
+            Une copie de la clé (bytes) ou None
+        """
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            key, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[fingerprint]
+                self._zeroize(key)
+                return None
+            self._entries.move_to_end(fingerprint)
+            return bytes(key)
+
+    def put(self, fingerprint: bytes, key: bytes) -> None:
+        """
+        Ajoute une clé, purge les entrées expirées et évince les plus
+        anciennes au-delà de max_entries.
+
+        Args:
+            fingerprint: L'empreinte de (phrase, sel, paramètres)
+            key: La clé maîtresse
+        """
+        with self._lock:
+            old = self._entries.pop(fingerprint, None)
+            if old is not None:
+                self._zeroize(old[0])
+            now = time.monotonic()
+            for expired in [f for f, (_, expires) in self._entries.items() if now >= expires]:
+                self._zeroize(self._entries.pop(expired)[0])
+            self._entries[fingerprint] = (bytearray(key), now + self.ttl)
+            while len(self._entries) > self.max_entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._zeroize(evicted)
+
+    def clear(self) -> None:
+        """Vide le cache en remettant toutes les clés à zéro."""
+        with self._lock:
+            for key, _ in self._entries.values():
+                self._zeroize(key)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache partagé par défaut
+_default_cache = DerivedKeyCache()
+
+
+def derive_master_key(passphrase: str, salt: bytes, method: str = "scrypt",
+                      params: dict = None, cache: DerivedKeyCache = _default_cache) -> bytes:
+    """
+    Dérive la clé maîtresse d'une phrase de passe (avec cache).
+
+    Args:
+        passphrase: La phrase de passe
+        salt: Le sel (au moins 16 octets recommandés)
+        method: "scrypt" ou "pbkdf2"
+        params: Les paramètres de la méthode (par défaut SCRYPT_PARAMS ou
+                {"iterations": PBKDF2_ITERATIONS})
+        cache: Le cache à utiliser, ou None pour toujours recalculer
+
+    Returns:
+        La clé maîtresse de MASTER_KEY_SIZE octets
+    """
+    if params is None:
+        params = SCRYPT_PARAMS if method == "scrypt" else {"iterations": PBKDF2_ITERATIONS}
+    secret = passphrase.encode('utf-8')
+
+    fingerprint = None
+    if cache is not None:
+        description = f"{method}:{sorted(params.items())}".encode('utf-8')
+        fingerprint = hmac.new(salt, description + b"\x00" + secret, hashlib.sha256).digest()
+        key = cache.get(fingerprint)
+        if key is not None:
+            return key
+
+    key = _kdf(secret, salt, method, params)
+    if cache is not None:
+        cache.put(fingerprint, key)
+    return key
+
+
+def derive_keys(passphrase: str, salt: bytes, xor_length: int = 32,
+                feistel_length: int = 64, **options) -> dict:
+    """
+    Dérive une clé pour chaque algorithme à partir d'une phrase de passe.
+
+    Args:
+        passphrase: La phrase de passe
+        salt: Le sel
+        xor_length: La longueur de la clé XOR en octets
+        feistel_length: La longueur de K1 et K2 en bits
+        **options: Les options de derive_master_key (method, params, cache)
+
+    Returns:
+        Un dictionnaire {"aes", "xor", "feistel", "cesar", "substitution"}
+    """
+    master_key = derive_master_key(passphrase, salt, **options)
+
+    feistel = expand(master_key, "feistel", 2 * ((feistel_length + 7) // 8))
+    half = len(feistel) // 2
+    key1 = format(int.from_bytes(feistel[:half], 'big'), f'0{8 * half}b')[:feistel_length]
+    key2 = format(int.from_bytes(feistel[half:], 'big'), f'0{8 * half}b')[:feistel_length]
+
+    return {
+        "aes": expand(master_key, "aes", 32),
+        "xor": _DerivedStream(master_key, "xor").token_bytes(xor_length),
+        "feistel": (key1, key2),
+        "cesar": 1 + _DerivedStream(master_key, "cesar").randbelow(25),
+        "substitution": derive_substitution_mapping(master_key),
+    }
+
+
+def derive_substitution_mapping(master_key: bytes) -> dict:
+    """
+    Dérive une table de substitution (même format que generate_random_mapping).
+
+    Args:
+        master_key: La clé maîtresse
+
+    Returns:
+        Le mapping des minuscules et des majuscules
+    """
+    shuffled = list(string.ascii_lowercase)
+    _DerivedStream(master_key, "substitution").shuffle(shuffled)
+    mapping = {}
+    for letter, target in zip(string.ascii_lowercase, shuffled):
+        mapping[letter] = target
+        mapping[letter.upper()] = target.upper()
+    return mapping
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    import cesar_cypher
+    import cryptage_xor
+
+    salt = new_salt()
+    passphrase = "correct cheval agrafe batterie"
+
+    start = time.perf_counter()
+    keys = derive_keys(passphrase, salt)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    keys_again = derive_keys(passphrase, salt)
+    cached = time.perf_counter() - start
+
+    print(f"Sel: {salt.hex()}")
+    print(f"Clé AES      : {keys['aes'].hex()}")
+    print(f"Clé XOR      : {keys['xor'].hex()}")
+    print(f"Clés Feistel : {keys['feistel'][0][:16]}... / {keys['feistel'][1][:16]}...")
+    print(f"Décalage     : {keys['cesar']}")
+    print(f"Substitution : a→{keys['substitution']['a']}, b→{keys['substitution']['b']}, ...")
+    print(f"\nPremière dérivation (scrypt): {first * 1000:.1f} ms")
+    print(f"Dérivation en cache         : {cached * 1e6:.0f} µs")
+    print(f"Clés identiques             : {keys == keys_again}")
+
+    # Déchiffrer plus tard avec la seule phrase de passe (et le sel)
+    chiffre = cryptage_xor.xor_encrypt(b"Message secret", keys["xor"])
+    _default_cache.clear()
+    cles = derive_keys(passphrase, salt)
+    print(f"\nXOR déchiffré   : {cryptage_xor.xor_decrypt(chiffre, cles['xor']).decode()}")
+    print(f"César déchiffré : {cesar_cypher.cesar_decrypt(cesar_cypher.cesar_encrypt('Bonjour', cles['cesar']), cles['cesar'])}")
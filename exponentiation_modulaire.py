@@ -0,0 +1,252 @@
+"""
+Moteur d'exponentiation modulaire pour RSA.
+
+Toutes les opérations de RSA.py reposent sur base^exposant mod n. Quand le
+même module et le même exposant sont réutilisés (chiffrements répétés sous
+une même clé publique), ModExpEngine prépare une fois par clé ce qui peut
+l'être :
+
+- "gmpy2" : module et exposant convertis une seule fois en entiers GMP ;
+- "window" : exposant découpé une seule fois en fenêtres glissantes, chaque
+  appel ne fait plus que les carrés et multiplications correspondants.
+
+Le choix est déterministe : gmpy2 s'il est installé, sinon le pow() natif.
+Écrit en C, pow() n'est pas battu de façon reproductible par les fenêtres
+glissantes en Python pur (écarts de quelques pour cent, de signe variable
+d'une mesure à l'autre) : le backend "window" n'est utilisé que s'il est
+demandé explicitement, par exemple après comparaison avec benchmark(). La
+réduction de Montgomery a été écartée : en CPython, la réduction REDC (deux
+multiplications et un décalage) est plus lente que l'opérateur %.
+
+Aucune opération de RSA.py ne réutilise une même base avec un même module
+(le test de Miller-Rabin change de module à chaque candidat) : les tables
+à base fixe n'ont pas d'appelant et ne sont pas fournies.
+"""
+
+import random
+import time
+from functools import lru_cache
+
+# gmpy2 est optionnel : exponentiation modulaire de GMP, bien plus rapide
+try:
+    import gmpy2
+    GMPY2_AVAILABLE = True
+except ImportError:
+    GMPY2_AVAILABLE = False
+
+
+def powmod(base: int, exponent: int, modulus: int) -> int:
+    """
+    Calcule base^exponent mod modulus avec le backend natif le plus rapide.
+
+    Args:
+        base: La base
+        exponent: L'exposant (positif)
+        modulus: Le module
+
+    Returns:
+        Le résultat de l'exponentiation modulaire
+    """
+    if GMPY2_AVAILABLE:
+        return int(gmpy2.powmod(base, exponent, modulus))
+    return pow(base, exponent, modulus)
+
+
+def window_size(exponent_bits: int) -> int:
+    """
+    Choisit la taille de fenêtre qui minimise le nombre de multiplications.
+
+    Args:
+        exponent_bits: La taille de l'exposant en bits
+
+    Returns:
+        La taille de fenêtre w (entre 1 et 6)
+    """
+    for limit, w in ((24, 1), (80, 3), (240, 4), (672, 5)):
+        if exponent_bits <= limit:
+            return w
+    return 6
+
+
+def sliding_window_recode(exponent: int, window: int) -> list:
+    """
+    Découpe l'exposant en fenêtres glissantes.
+
+    Chaque élément (carrés, chiffre) signifie : élever au carré `carrés`
+    fois, puis multiplier par base^chiffre (chiffre impair, ou 0 pour ne
+    rien multiplier).
+
+    Args:
+        exponent: L'exposant à découper
+        window: La taille maximale d'une fenêtre en bits
+
+    Returns:
+        La liste des opérations, du bit de poids fort au bit de poids faible
+    """
+    bits = bin(exponent)[2:]
+    steps = []
+    i = 0
+    pending = 0
+
+    while i < len(bits):
+        if bits[i] == '0':
+            pending += 1
+            i += 1
+            continue
+        # Fenêtre la plus longue possible se terminant par un bit à 1
+        j = min(i + window, len(bits))
+        while bits[j - 1] == '0':
+            j -= 1
+        steps.append((pending + j - i, int(bits[i:j], 2)))
+        pending = 0
+        i = j
+
+    if pending:
+        steps.append((pending, 0))
+    return steps
+
+
+class ModExpEngine:
+    """
+    Exponentiation x -> x^exponent mod modulus pour un module et un exposant fixés.
+
+    Exemple:
+        engine = ModExpEngine(n, e)
+        c = engine(m)
+    """
+
+    def __init__(self, modulus: int, exponent: int, backend: str = "auto"):
+        """
+        Args:
+            modulus: Le module (n)
+            exponent: L'exposant fixé (e ou d)
+            backend: "gmpy2", "builtin", "window" ou "auto" (gmpy2 s'il est
+                     installé, sinon builtin)
+
+        Raises:
+            ValueError: Si le backend est inconnu ou indisponible
+        """
+        self.modulus = modulus
+        self.exponent = exponent
+        if backend == "auto":
+            backend = "gmpy2" if GMPY2_AVAILABLE else "builtin"
+        if backend not in ("gmpy2", "builtin", "window"):
+            raise ValueError(f"Backend inconnu: {backend}")
+        if backend == "gmpy2" and not GMPY2_AVAILABLE:
+            raise ValueError("Le backend gmpy2 n'est pas installé")
+        self.backend = backend
+
+        if backend == "window":
+            # Précalcul par clé : découpage de l'exposant en fenêtres
+            self.window = window_size(exponent.bit_length())
+            self.steps = sliding_window_recode(exponent, self.window)
+        elif backend == "gmpy2":
+            self._modulus_mpz = gmpy2.mpz(modulus)
+            self._exponent_mpz = gmpy2.mpz(exponent)
+
+    def __call__(self, base: int) -> int:
+        """
+        Calcule base^exponent mod modulus.
+
+        Args:
+            base: La base
+
+        Returns:
+            Le résultat de l'exponentiation
+        """
+        if self.backend == "builtin":
+            return pow(base, self.exponent, self.modulus)
+        if self.backend == "gmpy2":
+            return int(gmpy2.powmod(base, self._exponent_mpz, self._modulus_mpz))
+        return self._sliding_window(base)
+
+    def _sliding_window(self, base: int) -> int:
+        """Exponentiation par fenêtres glissantes en Python pur."""
+        n = self.modulus
+        base %= n
+        # Puissances impaires base^1, base^3, ..., base^(2^w - 1)
+        square = base * base % n
+        odd_powers = [base]
+        for _ in range((1 << (self.window - 1)) - 1):
+            odd_powers.append(odd_powers[-1] * square % n)
+
+        result = 1
+        for squarings, digit in self.steps:
+            for _ in range(squarings):
+                result = result * result % n
+            if digit:
+                result = result * odd_powers[digit >> 1] % n
+        return result % n
+
+    def map(self, bases) -> list:
+        """
+        Applique l'exponentiation à une suite de bases.
+
+        Args:
+            bases: Un itérable d'entiers
+
+        Returns:
+            La liste des résultats, dans le même ordre
+        """
+        return [self(base) for base in bases]
+
+
+@lru_cache(maxsize=64)
+def get_engine(modulus: int, exponent: int) -> ModExpEngine:
+    """
+    Renvoie le moteur associé à une clé, créé une seule fois par clé.
+
+    Args:
+        modulus: Le module (n)
+        exponent: L'exposant (e ou d)
+
+    Returns:
+        Le ModExpEngine de cette clé
+    """
+    return ModExpEngine(modulus, exponent)
+
+
+def benchmark(sizes: tuple = (1024, 2048), rounds: int = 20, repeat: int = 5) -> None:
+    """
+    Compare pow() natif, les fenêtres glissantes et gmpy2 (si installé),
+    et affiche le temps moyen par exponentiation (meilleure de `repeat`
+    séries, après un appel d'échauffement).
+
+    Args:
+        sizes: Les tailles de module testées en bits
+        rounds: Le nombre d'exponentiations par série
+        repeat: Le nombre de séries
+    """
+    print(f"{'module':>7} {'exposant':>9} {'backend':>10} {'µs/op':>10}")
+    for bits in sizes:
+        rng = random.Random(bits)
+        n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        bases = [rng.randrange(2, n) for _ in range(rounds)]
+
+        for label, exponent in (("65537", 65537), ("complet", rng.getrandbits(bits) | 1)):
+            backends = ["builtin", "window"] + (["gmpy2"] if GMPY2_AVAILABLE else [])
+            for backend in backends:
+                engine = ModExpEngine(n, exponent, backend)
+                engine(bases[0])
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    for base in bases:
+                        engine(base)
+                    best = min(best, time.perf_counter() - start)
+                elapsed = best / rounds
+                print(f"{bits:>7} {label:>9} {backend:>10} {elapsed * 1e6:>10.1f}")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    n = 3233      # 61 * 53
+    e = 17
+    engine = ModExpEngine(n, e, backend="window")
+    print(f"Découpage de e={e} (fenêtre {engine.window}): {engine.steps}")
+    print(f"65^{e} mod {n} = {engine(65)} (pow: {pow(65, e, n)})")
+
+    print(f"\nBackend automatique: {ModExpEngine((1 << 2047) | 1, 65537).backend}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
@@ -1,4 +1,4 @@
-import random
+import materiel_cles
 
 def text_to_binary(text):
     """Convertit un texte en chaîne binaire (8 bits par caractère)."""
@@ -28,10 +28,8 @@ def xor(a, b):
 
 def generate_key(length):
     """Génère une clé binaire aléatoire de la longueur spécifiée."""
-    key = ""
-    for _ in range(length):
-        key += str(random.randint(0, 1))
-    return key
+    # Bits tirés d'un générateur sûr (os.urandom), en un seul appel
+    return materiel_cles.bit_string(length)
 
 def feistel_encrypt(plaintext, key1, key2):
     """
@@ -76,6 +74,33 @@ def feistel_encrypt(plaintext, key1, key2):
     
     return binary_to_text(ciphertext_binary)
 
+def feistel_encrypt_int(plaintext, key1, key2):
+    """
+    Chiffrement Feistel à 2 tours sur des entiers.
+
+    Même résultat que feistel_encrypt : les moitiés sont des entiers et
+    chaque tour un XOR d'entiers. Les textes avec un caractère au-delà de
+    U+00FF (codé sur plus de 8 bits par text_to_binary) sont confiés à
+    feistel_encrypt.
+    """
+    try:
+        data = plaintext.encode('latin-1')
+    except UnicodeEncodeError:
+        return feistel_encrypt(plaintext, key1, key2)
+
+    # Ajuster les clés à la taille des moitiés (mêmes erreurs que feistel_encrypt)
+    half = 4 * len(data)
+    K1 = (key1 * ((half // len(key1)) + 1))[:half]
+    K2 = (key2 * ((half // len(key2)) + 1))[:half]
+    if half == 0:
+        return ""
+
+    value = int.from_bytes(data, 'big')
+    L0, R0 = value >> half, value & ((1 << half) - 1)
+    R1 = L0 ^ R0 ^ int(K1, 2)      # Tour 1 : L1 = R0
+    R2 = R0 ^ R1 ^ int(K2, 2)      # Tour 2 : L2 = R1
+    return ((R1 << half) | R2).to_bytes(len(data), 'big').decode('latin-1')
+
 def feistel_decrypt(ciphertext, key1, key2):
     """
     Déchiffrement Feistel à 2 tours.
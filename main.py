@@ -3,11 +3,19 @@ Programme principal pour tester différents algorithmes de chiffrement.
 L'utilisateur peut choisir un algorithme et chiffrer/déchiffrer un texte.
 """
 
+import argparse
+import sys
+
 import cesar_cypher
 import substitution_cypher
 import cryptage_xor
 import feistel_block_cypher_cryptage
 import RSA
+import stockage_cles_rsa
+
+# Stockage des clés RSA réutilisées d'une exécution à l'autre
+KEYSTORE_PATH = "cles_rsa"
+RSA_KEY_NAME = "tp3-main-512"
 
 # Pour AES-GCM (nécessite la bibliothèque cryptography)
 try:
@@ -150,12 +158,19 @@ def chiffrement_aes_gcm():
 def chiffrement_rsa():
     """Interface pour le chiffrement RSA."""
     print("\n--- Chiffrement RSA ---")
-    print("(Génération des clés en cours, veuillez patienter...)")
     
-    # Générer les clés RSA (512 bits pour la démonstration rapide)
-    public_key, private_key = RSA.rsa_keygen(512)
+    # Recharger les clés RSA enregistrées, ou les générer (512 bits pour la démonstration rapide)
+    kid = stockage_cles_rsa.key_id_from_name(RSA_KEY_NAME)
+    with stockage_cles_rsa.KeyStore(KEYSTORE_PATH) as store:
+        if kid in store:
+            print(f"(Clés chargées depuis {KEYSTORE_PATH}.dat)")
+            public_key, private_key = store.get(kid)
+        else:
+            print("(Génération des clés en cours, veuillez patienter...)")
+            public_key, private_key = RSA.rsa_keygen(512)
+            store.put(public_key, private_key, kid)
     n, e = public_key
-    _, d = private_key
+    d = private_key[1]  # (n, d) ou forme CRT (n, d, p, q, dp, dq, qinv)
     
     print("\n[PUBLIC KEY] Cle publique generee:")
     print(f"   n = {str(n)[:50]}..." if len(str(n)) > 50 else f"   n = {n}")
@@ -167,17 +182,63 @@ def chiffrement_rsa():
     texte = input("\nEntrez le texte à chiffrer: ")
     
     try:
-        # Chiffrement
-        chiffre = RSA.rsa_encrypt_text(texte, public_key)
-        print(f"\nTexte chiffré: {str(chiffre)[:80]}..." if len(str(chiffre)) > 80 else f"\nTexte chiffré: {chiffre}")
+        # Chiffrement (octets UTF-8, bourrage PKCS#1 v1.5, blocs de taille fixe)
+        chiffre = RSA.rsa_encrypt_bytes(texte.encode('utf-8'), public_key)
+        chiffre_hex = chiffre.hex()
+        print(f"\nTexte chiffré (hex): {chiffre_hex[:80]}..." if len(chiffre_hex) > 80 else f"\nTexte chiffré (hex): {chiffre_hex}")
         
         # Déchiffrement
-        dechiffre = RSA.rsa_decrypt_text(chiffre, private_key)
-        print(f"Vérification (déchiffré): {dechiffre}")
+        dechiffre = RSA.rsa_decrypt_bytes(chiffre, private_key)
+        print(f"Vérification (déchiffré): {dechiffre.decode('utf-8')}")
     except ValueError as e:
         print(f"\nErreur: {e}")
 
 
+def mode_client(arguments):
+    """
+    Mode client léger : envoie une seule requête au démon de chiffrement.
+    
+    Exemple:
+        python main.py client --algo xor --key cle "Bonjour"
+        python main.py client --algo xor --key cle --decrypt 2103...
+    """
+    import daemon_chiffrement
+    
+    parser = argparse.ArgumentParser(prog="main.py client",
+                                     description="Client du démon de chiffrement")
+    parser.add_argument("--socket", default=daemon_chiffrement.DEFAULT_SOCKET)
+    parser.add_argument("--algo", required=True,
+                        choices=["cesar", "xor", "aes_gcm", "rsa", "feistel"])
+    parser.add_argument("--key", default="",
+                        help="décalage (cesar), texte (xor), hex (aes_gcm), "
+                             "identifiant hex ou 'new' (rsa), K1:K2 (feistel)")
+    parser.add_argument("--decrypt", action="store_true",
+                        help="déchiffrer (le texte est alors donné en hex)")
+    parser.add_argument("texte")
+    args = parser.parse_args(arguments)
+    
+    with daemon_chiffrement.CipherClient(args.socket) as client:
+        if args.algo == "rsa" and args.key == "new":
+            key = client.new_rsa_key()
+            print(f"Nouvelle clé RSA: {key.hex()}")
+        elif args.algo in ("aes_gcm", "rsa"):
+            key = bytes.fromhex(args.key)
+        else:
+            key = args.key.encode('utf-8')
+        
+        try:
+            if args.decrypt:
+                resultat = client.decrypt(args.algo, key, bytes.fromhex(args.texte))
+                print(resultat.decode('utf-8', errors='replace'))
+            else:
+                resultat = client.encrypt(args.algo, key, args.texte.encode('utf-8'))
+                print(resultat.hex())
+        except ValueError as e:
+            print(f"Erreur: {e}")
+            return 1
+    return 0
+
+
 def main():
     """Fonction principale du programme."""
     print("\nBienvenue dans l'outil de chiffrement TP3!")
@@ -208,5 +269,7 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "client":
+        sys.exit(mode_client(sys.argv[2:]))
     main()
 
@@ -0,0 +1,249 @@
+"""
+Générateur de matériel de clé cryptographiquement sûr, avec tampon.
+
+Le module `random` n'est pas fait pour la cryptographie (son état peut être
+reconstitué à partir de ses sorties) et l'appeler une fois par bit est
+lent : `generate_key` de Feistel faisait 4 millions d'appels à
+random.randint pour un message de 1 Mo.
+
+KeyMaterialPool tire de grands blocs de os.urandom dans un tampon et sert
+la clé sous la forme demandée :
+- octets bruts (token_bytes)
+- entier de k bits (randbits) ou chaîne binaire "0101..." (bit_string)
+- entier uniforme dans [0, n) par rejet, sans biais modulo (randbelow)
+- permutation par mélange de Fisher-Yates (shuffle, permutation)
+"""
+
+import os
+import random
+import threading
+import time
+
+# Taille d'un bloc tiré de os.urandom
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+
+class KeyMaterialPool:
+    """
+    Réserve d'octets aléatoires sûrs, remplie par blocs depuis os.urandom.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Args:
+            block_size: Le nombre d'octets tirés à chaque remplissage
+        """
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._position = 0
+
+    def reset(self) -> None:
+        """
+        Vide le tampon.
+
+        Appelé automatiquement dans un processus fils après fork(), pour que
+        le parent et l'enfant ne servent jamais les mêmes octets.
+        """
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._position = 0
+
+    def token_bytes(self, n: int) -> bytes:
+        """
+        Renvoie n octets aléatoires.
+
+        Args:
+            n: Le nombre d'octets
+
+        Returns:
+            Les octets aléatoires
+        """
+        if n >= self.block_size:
+            # Demande plus grande qu'un bloc : inutile de passer par le tampon
+            return os.urandom(n)
+        with self._lock:
+            if self._position + n > len(self._buffer):
+                self._buffer = os.urandom(self.block_size)
+                self._position = 0
+            start = self._position
+            self._position += n
+            return self._buffer[start:self._position]
+
+    def randbits(self, k: int) -> int:
+        """
+        Renvoie un entier aléatoire de k bits (entre 0 et 2^k - 1).
+
+        Args:
+            k: Le nombre de bits
+
+        Returns:
+            L'entier aléatoire
+        """
+        if k <= 0:
+            return 0
+        value = int.from_bytes(self.token_bytes((k + 7) // 8), 'big')
+        return value >> (-k % 8)
+
+    def bit_string(self, length: int) -> str:
+        """
+        Renvoie une clé binaire sous forme de chaîne de '0' et de '1'.
+
+        Args:
+            length: Le nombre de bits
+
+        Returns:
+            La chaîne binaire de `length` caractères
+        """
+        if length <= 0:
+            return ""
+        return format(self.randbits(length), f'0{length}b')
+
+    def randbelow(self, n: int) -> int:
+        """
+        Renvoie un entier uniforme entre 0 et n - 1.
+
+        On tire des entiers de la taille de n - 1 en bits et on rejette ceux
+        qui dépassent : chaque tirage est accepté avec une probabilité
+        d'au moins 1/2, sans le biais d'un simple modulo.
+
+        Args:
+            n: La borne (exclue), strictement positive
+
+        Returns:
+            L'entier aléatoire
+
+        Raises:
+            ValueError: Si n n'est pas strictement positif
+        """
+        if n <= 0:
+            raise ValueError("La borne doit être strictement positive")
+        k = (n - 1).bit_length()
+        while True:
+            value = self.randbits(k)
+            if value < n:
+                return value
+
+    def shuffle(self, items: list) -> None:
+        """
+        Mélange une liste en place (algorithme de Fisher-Yates).
+
+        Pour les listes d'au plus 256 éléments (alphabets, tables d'octets),
+        chaque indice est tiré d'un seul octet pris dans un bloc demandé en
+        une fois : un octet b est rejeté s'il dépasse le plus grand multiple
+        de m inférieur à 256, sinon l'indice vaut b mod m, sans biais.
+
+        Args:
+            items: La liste à mélanger
+        """
+        n = len(items)
+        if n > 256:
+            for i in range(n - 1, 0, -1):
+                j = self.randbelow(i + 1)
+                items[i], items[j] = items[j], items[i]
+            return
+
+        stream = self.token_bytes(2 * n)
+        position = 0
+        for i in range(n - 1, 0, -1):
+            m = i + 1
+            limit = 256 - 256 % m
+            while True:
+                if position == len(stream):
+                    stream = self.token_bytes(n)
+                    position = 0
+                b = stream[position]
+                position += 1
+                if b < limit:
+                    break
+            j = b % m
+            items[i], items[j] = items[j], items[i]
+
+    def permutation(self, n: int) -> list:
+        """
+        Renvoie une permutation aléatoire de 0, 1, ..., n - 1.
+
+        Args:
+            n: La taille de la permutation
+
+        Returns:
+            La liste permutée
+        """
+        items = list(range(n))
+        self.shuffle(items)
+        return items
+
+
+# Réserve partagée par les modules de chiffrement
+_default_pool = KeyMaterialPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_default_pool.reset)
+
+token_bytes = _default_pool.token_bytes
+randbits = _default_pool.randbits
+bit_string = _default_pool.bit_string
+randbelow = _default_pool.randbelow
+shuffle = _default_pool.shuffle
+permutation = _default_pool.permutation
+
+
+def _legacy_generate_key(length: int) -> str:
+    """Ancienne version de feistel_block_cypher_cryptage.generate_key (référence)."""
+    key = ""
+    for _ in range(length):
+        key += str(random.randint(0, 1))
+    return key
+
+
+def benchmark(message_size: int = 1 << 20) -> None:
+    """
+    Compare le débit de génération de clés avec les anciennes fonctions.
+
+    Args:
+        message_size: La taille du message en octets ; une clé Feistel fait
+                      la moitié de sa taille en bits
+    """
+    key_length = message_size * 8 // 2
+    print(f"Clé Feistel pour un message de {message_size / (1 << 20):.1f} Mo "
+          f"({key_length} bits)")
+
+    start = time.perf_counter()
+    _legacy_generate_key(key_length)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bit_string(key_length)
+    pooled = time.perf_counter() - start
+
+    print(f"  random.randint par bit : {legacy * 1000:10.1f} ms")
+    print(f"  KeyMaterialPool        : {pooled * 1000:10.1f} ms "
+          f"(x{legacy / pooled:.0f})")
+
+    rounds = 10000
+    alphabet = list("abcdefghijklmnopqrstuvwxyz")
+    print(f"\n{rounds} tables de substitution (26 lettres)")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        random.shuffle(alphabet.copy())
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        shuffle(alphabet.copy())
+    pooled = time.perf_counter() - start
+
+    print(f"  random.shuffle (non sûr) : {legacy * 1000:8.1f} ms")
+    print(f"  KeyMaterialPool.shuffle  : {pooled * 1000:8.1f} ms")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    print(f"16 octets        : {token_bytes(16).hex()}")
+    print(f"Clé Feistel 20 b : {bit_string(20)}")
+    print(f"Décalage César   : {randbelow(26)}")
+    print(f"Permutation      : {permutation(10)}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
@@ -0,0 +1,392 @@
+"""
+Pipeline « compresser puis chiffrer » en flux.
+
+Les journaux et le JSON se compressent très bien : les compresser avant de
+les chiffrer réduit à la fois le travail du chiffrement et les octets
+écrits. Un texte chiffré, lui, ne se compresse plus : la compression doit
+donc avoir lieu avant.
+
+Format d'un flux chiffré :
+    "TP3C" | version (1 octet) | compression (1 octet) | chiffrement (1 octet)
+    puis le corps chiffré.
+
+Tout se fait par morceaux (compresseurs incrémentaux zlib/bz2/lzma, sortie
+de décompression bornée), donc en mémoire constante quelle que soit la
+taille de l'entrée.
+
+Chiffrements disponibles :
+- "xor" : chiffrement par flux, la position dans la clé est conservée
+  d'un morceau à l'autre (clé = octets)
+- "aes_gcm" : chaque enregistrement est chiffré séparément, précédé de son
+  nonce et de sa longueur (clé = 16, 24 ou 32 octets). Les données
+  associées contiennent l'en-tête, le numéro de l'enregistrement et un
+  indicateur de dernier enregistrement : un enregistrement supprimé,
+  déplacé ou ajouté, ou un flux tronqué, fait échouer l'authentification
+- "feistel" : chaque enregistrement est chiffré séparément, précédé de sa
+  longueur (clé = (K1, K2) en chaînes binaires)
+"""
+
+import bz2
+import json
+import lzma
+import os
+import struct
+import time
+import zlib
+
+import cryptage_xor
+import feistel_block_cypher_cryptage
+
+MAGIC = b"TP3C"
+VERSION = 1
+HEADER = struct.Struct(">4sBBB")
+
+# Identifiants enregistrés dans l'en-tête
+COMPRESSIONS = {"none": 0, "zlib": 1, "bz2": 2, "lzma": 3}
+CIPHERS = {"xor": 1, "aes_gcm": 2, "feistel": 3}
+
+# Taille des morceaux lus et des enregistrements chiffrés
+CHUNK_SIZE = 1 << 16
+FRAME_LENGTH = struct.Struct(">I")
+NONCE_SIZE = 12
+
+# Données associées d'un enregistrement AES-GCM (après l'en-tête) :
+# numéro de l'enregistrement, 1 pour le dernier
+RECORD_AAD = struct.Struct(">QB")
+
+
+class _Identity:
+    """Compresseur neutre (compression "none")."""
+
+    def compress(self, data):
+        return bytes(data)
+
+    def flush(self):
+        return b""
+
+
+def _compressor(name: str, level: int = None):
+    """Crée un compresseur incrémental."""
+    if name == "zlib":
+        return zlib.compressobj(6 if level is None else level)
+    if name == "bz2":
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if name == "lzma":
+        return lzma.LZMACompressor(preset=level)
+    if name == "none":
+        return _Identity()
+    raise ValueError(f"Compression inconnue: {name}")
+
+
+def _decompress_all(name: str, chunks):
+    """
+    Décompresse un flux par morceaux, chaque sortie faisant au plus CHUNK_SIZE octets.
+
+    Raises:
+        ValueError: Si le flux compressé s'arrête avant sa fin, ou si des
+                    octets le suivent
+    """
+    if name == "none":
+        yield from chunks
+        return
+    if name == "zlib":
+        decompressor = zlib.decompressobj()
+        for chunk in chunks:
+            if decompressor.eof and chunk:
+                raise ValueError("Données en trop après la fin du flux compressé")
+            data = chunk
+            while data and not decompressor.eof:
+                output = decompressor.decompress(data, CHUNK_SIZE)
+                if output:
+                    yield output
+                data = decompressor.unconsumed_tail
+            if decompressor.eof and (data or decompressor.unused_data):
+                raise ValueError("Données en trop après la fin du flux compressé")
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+        if not decompressor.eof:
+            raise ValueError("Flux chiffré tronqué")
+        return
+
+    decompressor = bz2.BZ2Decompressor() if name == "bz2" else lzma.LZMADecompressor()
+    for chunk in chunks:
+        if decompressor.eof:
+            if chunk:
+                raise ValueError("Données en trop après la fin du flux compressé")
+            continue
+        data = chunk
+        while not decompressor.eof:
+            output = decompressor.decompress(data, CHUNK_SIZE)
+            data = b""
+            if output:
+                yield output
+            if decompressor.needs_input:
+                break
+        if decompressor.unused_data:
+            raise ValueError("Données en trop après la fin du flux compressé")
+    if not decompressor.eof:
+        raise ValueError("Flux chiffré tronqué")
+
+
+def _rechunk(chunks, size: int):
+    """Regroupe des morceaux de tailles quelconques en morceaux de `size` octets."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _frames(chunks):
+    """Découpe un flux en enregistrements (longueur sur 4 octets + contenu)."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= FRAME_LENGTH.size:
+            (length,) = FRAME_LENGTH.unpack_from(buffer)
+            if len(buffer) < FRAME_LENGTH.size + length:
+                break
+            yield bytes(buffer[FRAME_LENGTH.size:FRAME_LENGTH.size + length])
+            del buffer[:FRAME_LENGTH.size + length]
+    if buffer:
+        raise ValueError("Flux chiffré tronqué")
+
+
+def _with_last(items):
+    """
+    Associe à chaque élément un indicateur « dernier élément ».
+
+    Un itérable vide donne un seul élément vide, marqué comme dernier : un
+    flux AES-GCM contient ainsi toujours un dernier enregistrement.
+    """
+    items = iter(items)
+    previous = next(items, b"")
+    for item in items:
+        yield previous, False
+        previous = item
+    yield previous, True
+
+
+def _xor_stream(chunks, key: bytes):
+    """Chiffre/déchiffre en XOR en conservant la position dans la clé."""
+    offset = 0
+    for chunk in chunks:
+        shift = offset % len(key)
+        yield cryptage_xor.xor_encrypt_int(chunk, key[shift:] + key[:shift])
+        offset += len(chunk)
+
+
+def _encrypt_body(cipher: str, chunks, key, header: bytes):
+    """Chiffre le flux compressé."""
+    if cipher == "xor":
+        yield from _xor_stream(chunks, key)
+    elif cipher == "aes_gcm":
+        import aes_gcm
+        for index, (chunk, last) in enumerate(_with_last(chunks)):
+            associated_data = header + RECORD_AAD.pack(index, last)
+            nonce, ciphertext = aes_gcm.aes_gcm_encrypt(key, chunk, associated_data)
+            yield FRAME_LENGTH.pack(NONCE_SIZE + len(ciphertext)) + nonce + ciphertext
+    elif cipher == "feistel":
+        key1, key2 = key
+        for chunk in chunks:
+            # latin-1 : un caractère par octet, comme le suppose text_to_binary
+            text = feistel_block_cypher_cryptage.feistel_encrypt_int(chunk.decode('latin-1'), key1, key2)
+            encrypted = text.encode('latin-1')
+            yield FRAME_LENGTH.pack(len(encrypted)) + encrypted
+    else:
+        raise ValueError(f"Chiffrement inconnu: {cipher}")
+
+
+def _decrypt_body(cipher: str, chunks, key, header: bytes):
+    """Déchiffre le corps d'un flux, morceau par morceau."""
+    if cipher == "xor":
+        yield from _xor_stream(chunks, key)
+    elif cipher == "aes_gcm":
+        import aes_gcm
+        from cryptography.exceptions import InvalidTag
+        for index, (frame, last) in enumerate(_with_last(_frames(chunks))):
+            associated_data = header + RECORD_AAD.pack(index, last)
+            try:
+                yield aes_gcm.aes_gcm_decrypt(key, frame[:NONCE_SIZE], frame[NONCE_SIZE:],
+                                              associated_data)
+            except InvalidTag:
+                raise ValueError("Enregistrement AES-GCM invalide (modifié, déplacé, "
+                                 "supprimé ou flux tronqué)") from None
+    elif cipher == "feistel":
+        key1, key2 = key
+        for frame in _frames(chunks):
+            text = feistel_block_cypher_cryptage.feistel_decrypt(frame.decode('latin-1'), key1, key2)
+            yield text.encode('latin-1')
+    else:
+        raise ValueError(f"Chiffrement inconnu: {cipher}")
+
+
+def encrypt_stream(chunks, cipher: str, key, compression: str = "zlib", level: int = None):
+    """
+    Compresse puis chiffre un flux de morceaux d'octets.
+
+    Args:
+        chunks: Un itérable de morceaux d'octets (le texte clair)
+        cipher: "xor", "aes_gcm" ou "feistel"
+        key: La clé du chiffrement choisi
+        compression: "zlib", "bz2", "lzma" ou "none"
+        level: Le niveau de compression (None = valeur par défaut)
+
+    Yields:
+        L'en-tête puis les morceaux du flux chiffré
+    """
+    if cipher not in CIPHERS:
+        raise ValueError(f"Chiffrement inconnu: {cipher}")
+    compressor = _compressor(compression, level)
+
+    def compressed():
+        for chunk in chunks:
+            output = compressor.compress(chunk)
+            if output:
+                yield output
+        yield compressor.flush()
+
+    header = HEADER.pack(MAGIC, VERSION, COMPRESSIONS[compression], CIPHERS[cipher])
+    yield header
+    yield from _encrypt_body(cipher, _rechunk(compressed(), CHUNK_SIZE), key, header)
+
+
+def decrypt_stream(chunks, key):
+    """
+    Déchiffre puis décompresse un flux produit par encrypt_stream.
+
+    Le chiffrement et la compression sont lus dans l'en-tête.
+
+    Args:
+        chunks: Un itérable de morceaux d'octets (le flux chiffré)
+        key: La clé du chiffrement utilisé
+
+    Yields:
+        Les morceaux du texte clair
+
+    Raises:
+        ValueError: Si l'en-tête est invalide, ou si le flux est tronqué ou
+                    modifié (détecté pour AES-GCM et la compression)
+    """
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= HEADER.size:
+            break
+    if len(head) < HEADER.size:
+        raise ValueError("Flux trop court pour contenir un en-tête")
+
+    magic, version, compression_id, cipher_id = HEADER.unpack_from(head)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("En-tête de flux invalide")
+    compression = {v: k for k, v in COMPRESSIONS.items()}.get(compression_id)
+    cipher = {v: k for k, v in CIPHERS.items()}.get(cipher_id)
+    if compression is None or cipher is None:
+        raise ValueError("Algorithme inconnu dans l'en-tête")
+
+    def body():
+        if len(head) > HEADER.size:
+            yield head[HEADER.size:]
+        yield from chunks
+
+    yield from _decompress_all(compression,
+                               _decrypt_body(cipher, body(), key, head[:HEADER.size]))
+
+
+def read_chunks(file, size: int = CHUNK_SIZE):
+    """Lit un fichier binaire ouvert par morceaux de `size` octets."""
+    return iter(lambda: file.read(size), b"")
+
+
+def encrypt_file(src: str, dst: str, cipher: str, key, compression: str = "zlib") -> int:
+    """
+    Compresse et chiffre un fichier.
+
+    Args:
+        src: Le chemin du fichier clair
+        dst: Le chemin du fichier chiffré
+        cipher: Le chiffrement
+        key: La clé
+        compression: L'algorithme de compression
+
+    Returns:
+        Le nombre d'octets écrits
+    """
+    written = 0
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        for chunk in encrypt_stream(read_chunks(fin), cipher, key, compression):
+            fout.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def decrypt_file(src: str, dst: str, key) -> int:
+    """
+    Déchiffre et décompresse un fichier produit par encrypt_file.
+
+    Args:
+        src: Le chemin du fichier chiffré
+        dst: Le chemin du fichier clair
+        key: La clé
+
+    Returns:
+        Le nombre d'octets écrits
+    """
+    written = 0
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        for chunk in decrypt_stream(read_chunks(fin), key):
+            fout.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def benchmark(size: int = 2 << 20, cipher: str = "xor") -> None:
+    """
+    Compare temps total et octets écrits avec et sans compression.
+
+    Args:
+        size: La taille approximative du journal JSON de test en octets
+        cipher: Le chiffrement utilisé
+    """
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = json.dumps({"id": i, "niveau": "INFO" if i % 7 else "ERREUR",
+                           "service": f"api-{i % 5}", "message": "requête traitée",
+                           "duree_ms": (i * 37) % 500}) + "\n"
+        lines.append(line.encode('utf-8'))
+        total += len(lines[-1])
+        i += 1
+    payload = b"".join(lines)
+    key = os.urandom(32) if cipher == "aes_gcm" else b"cle_secrete"
+
+    print(f"Journal JSON de {len(payload) / (1 << 20):.1f} Mo, chiffrement {cipher}")
+    print(f"{'compression':>12} {'octets écrits':>14} {'ratio':>7} {'temps (s)':>10}")
+    for compression in COMPRESSIONS:
+        start = time.perf_counter()
+        encrypted = b"".join(encrypt_stream(_rechunk([payload], CHUNK_SIZE), cipher, key, compression))
+        elapsed = time.perf_counter() - start
+        assert b"".join(decrypt_stream([encrypted], key)) == payload
+        print(f"{compression:>12} {len(encrypted):>14} "
+              f"{len(encrypted) / len(payload):>7.3f} {elapsed:>10.2f}")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    message = b"Bonjour, ceci est un message secret! " * 100
+    key = b"cle_secrete"
+
+    encrypted = b"".join(encrypt_stream([message], "xor", key, "zlib"))
+    print(f"Message de {len(message)} octets -> {len(encrypted)} octets chiffrés")
+
+    decrypted = b"".join(decrypt_stream([encrypted], key))
+    print(f"Déchiffrement identique: {decrypted == message}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
@@ -0,0 +1,342 @@
+"""
+Tests de primalité rapides et génération de nombres premiers par lots.
+
+`RSA.is_prime` tire k=10 bases aléatoires pour chaque candidat et teste les
+candidats un par un. Ce module propose :
+
+- is_probable_prime : division par les petits premiers, puis
+  * n < 2^64 : Miller-Rabin avec les 12 premières bases premières, un
+    ensemble prouvé déterministe en dessous de 3.3 * 10^24 ;
+  * n plus grand : test BPSW (Miller-Rabin en base 2 + test de Lucas fort),
+    sans contre-exemple connu.
+- sieve_candidates : crible d'un intervalle de candidats impairs par les
+  petits premiers, qui élimine la grande majorité des composés sans aucune
+  exponentiation.
+- first_prime : teste un lot de candidats, éventuellement réparti sur
+  plusieurs processus, et s'arrête au premier nombre premier trouvé.
+- random_prime : génération d'un nombre premier par crible + lots.
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import materiel_cles
+
+
+def _small_primes(limit: int) -> list:
+    """Crible d'Ératosthène : liste des nombres premiers inférieurs à limit."""
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for p in range(2, math.isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, limit, p)))
+    return [p for p in range(limit) if sieve[p]]
+
+
+SMALL_PRIMES = _small_primes(2000)
+
+# Bases prouvées déterministes pour n < 3 317 044 064 679 887 385 961 981
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Nombre de candidats impairs criblés d'un coup, par bit de la taille visée
+SIEVE_WINDOW_PER_BIT = 4
+
+# Nombre de candidats envoyés à un processus en une fois
+BATCH_SIZE = 16
+
+
+def strong_probable_prime(n: int, a: int) -> bool:
+    """
+    Test de Miller-Rabin (test fort) de n en base a.
+
+    Args:
+        n: L'entier impair à tester (n > 2)
+        a: La base
+
+    Returns:
+        True si n est un pseudo-premier fort en base a
+    """
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(r - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def jacobi(a: int, n: int) -> int:
+    """
+    Calcule le symbole de Jacobi (a/n) pour n impair positif.
+
+    Args:
+        a: Le numérateur
+        n: Le dénominateur (impair, positif)
+
+    Returns:
+        -1, 0 ou 1
+    """
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n: int) -> bool:
+    """
+    Test de Lucas fort, paramètres de Selfridge (méthode A).
+
+    D est le premier élément de 5, -7, 9, -11, ... tel que (D/n) = -1,
+    P = 1 et Q = (1 - D) / 4.
+
+    Args:
+        n: L'entier impair à tester (n > 2)
+
+    Returns:
+        True si n est un pseudo-premier de Lucas fort
+    """
+    # Un carré parfait n'admet aucun D convenable
+    if math.isqrt(n) ** 2 == n:
+        return False
+
+    D = 5
+    while True:
+        j = jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    # Calcul de U_d, V_d et Q^d par la méthode binaire
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        # Doublement : U_2k = U_k V_k, V_2k = V_k^2 - 2 Q^k
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == '1':
+            # Incrément : U_k+1 = (P U_k + V_k) / 2, V_k+1 = (D U_k + P V_k) / 2
+            U, V = P * U + V, D * U + P * V
+            if U % 2:
+                U += n
+            if V % 2:
+                V += n
+            U, V = (U // 2) % n, (V // 2) % n
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def is_probable_prime(n: int) -> bool:
+    """
+    Teste si n est premier (déterministe sous 2^64, BPSW au-delà).
+
+    Args:
+        n: L'entier à tester
+
+    Returns:
+        True si n est premier (ou pseudo-premier BPSW pour n >= 2^64)
+    """
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    if n < 1 << 64:
+        return all(strong_probable_prime(n, a) for a in DETERMINISTIC_BASES)
+    return strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)
+
+
+def sieve_candidates(start: int, count: int) -> list:
+    """
+    Crible les `count` entiers impairs à partir de `start` par les petits premiers.
+
+    Args:
+        start: Le premier candidat (rendu impair si besoin)
+        count: Le nombre de candidats impairs examinés
+
+    Returns:
+        Les candidats sans petit facteur premier, dans l'ordre croissant
+    """
+    start |= 1
+    alive = bytearray([1]) * count
+    for p in SMALL_PRIMES[1:]:
+        # Premier indice i tel que start + 2i ≡ 0 (mod p)
+        first = (-start * ((p + 1) // 2)) % p
+        if start + 2 * first == p:
+            first += p  # ne pas rayer p lui-même
+        alive[first::p] = bytes(len(range(first, count, p)))
+    return [start + 2 * i for i in range(count) if alive[i]]
+
+
+def _first_prime_in(candidates: list):
+    """Renvoie le premier candidat premier d'un lot, ou None (exécuté dans un processus)."""
+    for n in candidates:
+        if is_probable_prime(n):
+            return n
+    return None
+
+
+def first_prime(candidates: list, workers: int = 1):
+    """
+    Cherche un nombre premier dans une liste de candidats.
+
+    En mode parallèle, les candidats sont envoyés par lots de BATCH_SIZE,
+    deux lots par processus au plus ; la recherche s'arrête dès qu'un lot
+    renvoie un nombre premier et les lots restants sont annulés.
+
+    Args:
+        candidates: Les candidats (déjà criblés de préférence)
+        workers: Le nombre de processus (1 = séquentiel)
+
+    Returns:
+        Un nombre premier de la liste, ou None s'il n'y en a pas
+    """
+    if workers <= 1:
+        return _first_prime_in(candidates)
+
+    batches = [candidates[i:i + BATCH_SIZE] for i in range(0, len(candidates), BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        next_batch = 0
+        while next_batch < len(batches) or pending:
+            while next_batch < len(batches) and len(pending) < 2 * workers:
+                pending.add(pool.submit(_first_prime_in, batches[next_batch]))
+                next_batch += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result() is not None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+    return None
+
+
+def random_prime(bits: int, workers: int = 1) -> int:
+    """
+    Génère un nombre premier aléatoire d'exactement `bits` bits.
+
+    Les deux bits de poids fort sont mis à 1, de sorte que le produit de
+    deux tels premiers fasse exactement 2 * bits bits.
+
+    Args:
+        bits: La taille du nombre premier en bits (au moins 2)
+        workers: Le nombre de processus pour tester les candidats
+
+    Returns:
+        Un nombre premier aléatoire
+    """
+    if bits < 2:
+        raise ValueError("Un nombre premier fait au moins 2 bits")
+    if bits <= 16:
+        # Trop petit pour cribler un intervalle : tirage direct
+        while True:
+            n = materiel_cles.randbits(bits) | (1 << (bits - 1)) | 1
+            if is_probable_prime(n):
+                return n
+
+    window = SIEVE_WINDOW_PER_BIT * bits
+    while True:
+        start = materiel_cles.randbits(bits) | (3 << (bits - 2)) | 1
+        candidates = [n for n in sieve_candidates(start, window) if n.bit_length() == bits]
+        prime = first_prime(candidates, workers)
+        if prime is not None:
+            return prime
+
+
+def _legacy_random_prime(bits: int) -> int:
+    """Ancienne version de RSA.random_prime (tirages indépendants + RSA.is_prime)."""
+    import RSA
+
+    while True:
+        n = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if RSA.is_prime(n):
+            return n
+
+
+def benchmark(sizes: tuple = (1024, 2048, 3072), rounds: int = 2) -> None:
+    """
+    Mesure le débit de candidats testés et l'accélération de la génération
+    de clés RSA (deux premiers de keysize / 2 bits) par rapport à RSA.py.
+
+    Args:
+        sizes: Les tailles de clé RSA en bits
+        rounds: Le nombre de paires de premiers générées par mesure
+    """
+    import RSA
+
+    print(f"{'clé':>5} {'cand./s RSA':>12} {'cand./s BPSW':>13} "
+          f"{'keygen RSA':>11} {'keygen lots':>12} {'gain':>6}")
+    for keysize in sizes:
+        bits = keysize // 2
+        candidates = [random.getrandbits(bits) | (1 << (bits - 1)) | 1 for _ in range(200)]
+
+        start = time.perf_counter()
+        for n in candidates:
+            RSA.is_prime(n)
+        legacy_rate = len(candidates) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for n in candidates:
+            is_probable_prime(n)
+        new_rate = len(candidates) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(2 * rounds):
+            _legacy_random_prime(bits)
+        legacy_keygen = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(2 * rounds):
+            random_prime(bits, workers=os.cpu_count())
+        new_keygen = (time.perf_counter() - start) / rounds
+
+        print(f"{keysize:>5} {legacy_rate:>12.0f} {new_rate:>13.0f} "
+              f"{legacy_keygen:>10.2f}s {new_keygen:>11.2f}s "
+              f"{legacy_keygen / new_keygen:>5.1f}x")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    # 3215031751 = 151 * 751 * 28351 : pseudo-premier fort pour les bases 2, 3, 5 et 7
+    for n in (97, 3215031751, 2 ** 61 - 1, 2 ** 127 - 1, (2 ** 127 - 1) * (2 ** 61 - 1)):
+        print(f"{n} premier ? {is_probable_prime(n)}")
+
+    print(f"\nPremier de 512 bits: {random_prime(512)}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
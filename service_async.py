@@ -0,0 +1,294 @@
+"""
+Interface asyncio pour la bibliothèque de chiffrement.
+
+Les fonctions de chiffrement sont synchrones et gourmandes en CPU :
+`RSA.rsa_keygen` ou un gros `xor_encrypt` bloqueraient la boucle
+d'événements d'un service web. CipherService les exécute dans un pool
+(threads ou processus) :
+
+    service = CipherService()
+    nonce, chiffre = await service.encrypt("aes_gcm", b"donnees", cle)
+
+- Regroupement : les petites requêtes simultanées qui utilisent le même
+  algorithme et la même clé sont regroupées en micro-lots, traités par un
+  seul appel au pool (un seul contexte AESGCM par lot, par exemple).
+- Contre-pression : au-delà de `max_pending` requêtes en cours, les
+  nouveaux appels attendent qu'une place se libère.
+
+Types attendus selon l'algorithme :
+- "cesar" : texte (str), clé = décalage (int)
+- "substitution" : texte (str), clé = mapping (dict) pour chiffrer,
+  mapping inverse pour déchiffrer
+- "xor" : octets, clé = octets
+- "feistel" : texte (str), clé = (K1, K2) en chaînes binaires
+- "aes_gcm" : octets, clé = octets ; encrypt renvoie (nonce, chiffré) et
+  decrypt attend ce même tuple
+- "rsa" : octets, clé publique pour chiffrer, clé privée pour déchiffrer
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cesar_cypher
+import cryptage_xor
+import feistel_block_cypher_cryptage
+import RSA
+import substitution_cypher
+
+
+def _aes_gcm_batch(operation: str, key: bytes, items: list) -> list:
+    """Traite un lot AES-GCM avec un seul contexte AESGCM."""
+    # Import local : la bibliothèque cryptography est optionnelle
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    aesgcm = AESGCM(key)
+    results = []
+    for item in items:
+        try:
+            if operation == "encrypt":
+                nonce = os.urandom(12)
+                results.append((True, (nonce, aesgcm.encrypt(nonce, item, b""))))
+            else:
+                nonce, ciphertext = item
+                results.append((True, aesgcm.decrypt(nonce, ciphertext, b"")))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+# (chiffrement, déchiffrement) pour chaque algorithme : fonction(données, clé)
+ALGORITHMS = {
+    "cesar": (cesar_cypher.cesar_translate, lambda text, shift: cesar_cypher.cesar_translate(text, -shift)),
+    "substitution": (substitution_cypher.translate, substitution_cypher.translate),
+    "xor": (cryptage_xor.xor_encrypt_int, cryptage_xor.xor_encrypt_int),
+    "feistel": (
+        lambda text, keys: feistel_block_cypher_cryptage.feistel_encrypt_int(text, *keys),
+        lambda text, keys: feistel_block_cypher_cryptage.feistel_decrypt(text, *keys),
+    ),
+    "aes_gcm": (None, None),  # traité par lots dans _aes_gcm_batch
+    "rsa": (
+        lambda data, key: RSA.rsa_encrypt_bytes(data, key, workers=1),
+        lambda data, key: RSA.rsa_decrypt_bytes(data, key, workers=1),
+    ),
+}
+
+
+def run_batch(algo: str, operation: str, key, items: list) -> list:
+    """
+    Applique une opération à un lot de données partageant la même clé.
+
+    Exécuté dans le pool : une erreur sur un élément n'interrompt pas le lot.
+    Les fonctions sont retrouvées dans ALGORITHMS à l'intérieur du pool, ce
+    qui permet d'utiliser un pool de processus malgré les lambdas.
+
+    Args:
+        algo: Le nom de l'algorithme (clé de ALGORITHMS)
+        operation: "encrypt" ou "decrypt"
+        key: La clé commune au lot
+        items: Les données à traiter
+
+    Returns:
+        Une liste de tuples (succès, résultat_ou_exception), dans l'ordre
+    """
+    if algo == "aes_gcm":
+        return _aes_gcm_batch(operation, key, items)
+
+    function = ALGORITHMS[algo][0 if operation == "encrypt" else 1]
+    results = []
+    for item in items:
+        try:
+            results.append((True, function(item, key)))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+def _batch_group(algo: str, operation: str, key) -> tuple:
+    """Clé de regroupement : les requêtes d'un lot partagent algo, opération et clé."""
+    if isinstance(key, dict):
+        key = tuple(sorted(key.items()))
+    try:
+        hash(key)
+    except TypeError:
+        key = repr(key)
+    return algo, operation, key
+
+
+class CipherService:
+    """
+    Service de chiffrement asynchrone avec regroupement et contre-pression.
+    """
+
+    def __init__(self, executor: str = "thread", max_workers: int = None,
+                 max_pending: int = 1024, batch_size: int = 64,
+                 batch_delay: float = 0.002, small_threshold: int = 4096):
+        """
+        Args:
+            executor: "thread" ou "process" (les processus contournent le GIL)
+            max_workers: La taille du pool (None = valeur par défaut du pool)
+            max_pending: Le nombre maximal de requêtes en cours
+            batch_size: La taille maximale d'un micro-lot
+            batch_delay: Le délai d'attente (en secondes) avant d'envoyer un
+                         micro-lot incomplet
+            small_threshold: La taille (en octets ou caractères) en dessous de
+                             laquelle une requête peut être regroupée
+
+        Raises:
+            ValueError: Si le type de pool est inconnu
+        """
+        if executor == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        elif executor == "process":
+            self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError(f"Pool inconnu: {executor}")
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.small_threshold = small_threshold
+        self._slots = asyncio.Semaphore(max_pending)
+        # Micro-lots en attente : groupe -> (clé, [(données, future), ...])
+        self._batches = {}
+
+    async def encrypt(self, algo: str, data, key):
+        """
+        Chiffre des données sans bloquer la boucle d'événements.
+
+        Args:
+            algo: Le nom de l'algorithme
+            data: Les données à chiffrer
+            key: La clé de chiffrement
+
+        Returns:
+            Le résultat de la fonction de chiffrement de l'algorithme
+        """
+        return await self._submit(algo, "encrypt", data, key)
+
+    async def decrypt(self, algo: str, data, key):
+        """
+        Déchiffre des données sans bloquer la boucle d'événements.
+
+        Args:
+            algo: Le nom de l'algorithme
+            data: Les données à déchiffrer
+            key: La clé de déchiffrement
+
+        Returns:
+            Le résultat de la fonction de déchiffrement de l'algorithme
+        """
+        return await self._submit(algo, "decrypt", data, key)
+
+    async def rsa_keygen(self, keysize: int = 1024) -> tuple:
+        """
+        Génère une paire de clés RSA dans le pool.
+
+        Args:
+            keysize: La taille de la clé en bits
+
+        Returns:
+            Un tuple (clé_publique, clé_privée)
+        """
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, RSA.rsa_keygen, keysize)
+
+    async def _submit(self, algo: str, operation: str, data, key):
+        """Envoie une requête, seule ou dans un micro-lot."""
+        if algo not in ALGORITHMS:
+            raise ValueError(f"Algorithme inconnu: {algo}")
+
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            size = len(data[1]) if isinstance(data, tuple) else len(data)
+
+            if size > self.small_threshold or self.batch_size <= 1:
+                # Requête volumineuse : envoyée seule au pool
+                [(ok, result)] = await loop.run_in_executor(
+                    self.executor, run_batch, algo, operation, key, [data])
+            else:
+                future = loop.create_future()
+                group = _batch_group(algo, operation, key)
+                if group not in self._batches:
+                    self._batches[group] = (key, [])
+                    loop.call_later(self.batch_delay, self._flush, group)
+                pending = self._batches[group][1]
+                pending.append((data, future))
+                if len(pending) >= self.batch_size:
+                    self._flush(group)
+                ok, result = await future
+
+            if not ok:
+                raise result
+            return result
+
+    def _flush(self, group: tuple) -> None:
+        """Envoie au pool le micro-lot en attente pour ce groupe."""
+        batch = self._batches.pop(group, None)
+        if batch is None:
+            return  # déjà envoyé car plein
+        key, pending = batch
+        algo, operation, _ = group
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, run_batch, algo, operation,
+                                    key, [data for data, _ in pending])
+
+        def dispatch(done):
+            try:
+                results = done.result()
+            except Exception as error:
+                results = [(False, error)] * len(pending)
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+        task.add_done_callback(dispatch)
+
+    def close(self) -> None:
+        """Arrête le pool."""
+        self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+_default_service = None
+
+
+def _get_default_service() -> CipherService:
+    global _default_service
+    if _default_service is None:
+        _default_service = CipherService()
+    return _default_service
+
+
+async def encrypt(algo: str, data, key):
+    """Chiffre avec le service par défaut (pool de threads)."""
+    return await _get_default_service().encrypt(algo, data, key)
+
+
+async def decrypt(algo: str, data, key):
+    """Déchiffre avec le service par défaut (pool de threads)."""
+    return await _get_default_service().decrypt(algo, data, key)
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    async def demo():
+        async with CipherService() as service:
+            messages = [f"Message numéro {i}".encode('utf-8') for i in range(5)]
+            chiffres = await asyncio.gather(
+                *(service.encrypt("xor", m, b"cle_secrete") for m in messages))
+            for chiffre in chiffres:
+                print(f"XOR (hex): {chiffre.hex()}")
+
+            texte = await service.encrypt("cesar", "Hello, ca va ?", 3)
+            print(f"César: {texte} -> {await service.decrypt('cesar', texte, 3)}")
+
+            public_key, private_key = await service.rsa_keygen(512)
+            chiffre = await service.encrypt("rsa", b"Bonjour RSA", public_key)
+            print(f"RSA: {await service.decrypt('rsa', chiffre, private_key)}")
+
+    asyncio.run(demo())
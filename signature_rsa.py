@@ -0,0 +1,243 @@
+"""
+Signature RSA (hacher puis signer, PKCS#1 v1.5 avec SHA-256) et
+vérification de signatures par lots.
+
+Signature :   s = EM^d mod n   où EM = 00 01 FF..FF 00 || DigestInfo || H(m)
+Vérification : s^e mod n == EM
+
+Avec e = 65537, une vérification ne coûte que 17 multiplications modulaires :
+vérifier des milliers d'enregistrements un par un est surtout dominé par
+le coût des appels Python. verify_batch :
+- hache les messages au fil de l'eau (octets, fichiers ouverts ou suites
+  de morceaux), sans les charger en entier ;
+- regroupe les enregistrements par clé publique et précalcule, une fois par
+  clé, l'entier correspondant à l'en-tête fixe de EM : la vérification se
+  réduit alors à une exponentiation et une comparaison d'entiers ;
+- répartit les groupes sur un pool de processus, en n'envoyant que les
+  empreintes et les signatures.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import RSA
+
+# En-tête DER de DigestInfo pour SHA-256 (RFC 8017, section 9.2)
+SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+DIGEST_SIZE = 32
+
+# Taille des morceaux lus lors du hachage d'un fichier
+HASH_CHUNK_SIZE = 1 << 16
+
+# Nombre d'enregistrements à partir duquel la vérification est répartie sur plusieurs processus
+PARALLEL_MIN_RECORDS = 512
+
+
+def hash_message(message) -> bytes:
+    """
+    Calcule l'empreinte SHA-256 d'un message, au fil de l'eau.
+
+    Args:
+        message: Des octets, un fichier ouvert en binaire (méthode read) ou
+                 un itérable de morceaux d'octets
+
+    Returns:
+        L'empreinte de 32 octets
+    """
+    digest = hashlib.sha256()
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        digest.update(message)
+    elif hasattr(message, "read"):
+        for chunk in iter(lambda: message.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    else:
+        for chunk in message:
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _encoded_prefix(block_size: int) -> bytes:
+    """
+    Partie fixe de EM pour une taille de module : 00 01 FF..FF 00 DigestInfo.
+
+    Raises:
+        ValueError: Si le module est trop petit pour SHA-256
+    """
+    padding_length = block_size - len(SHA256_DIGEST_INFO) - DIGEST_SIZE - 3
+    if padding_length < 8:
+        raise ValueError("Module trop petit pour une signature SHA-256")
+    return b"\x00\x01" + b"\xff" * padding_length + b"\x00" + SHA256_DIGEST_INFO
+
+
+def encode_digest(digest: bytes, block_size: int) -> bytes:
+    """
+    Encode une empreinte selon EMSA-PKCS1-v1_5.
+
+    Args:
+        digest: L'empreinte SHA-256
+        block_size: La taille du module en octets
+
+    Returns:
+        Le bloc EM de block_size octets
+    """
+    return _encoded_prefix(block_size) + digest
+
+
+def sign(message, private_key: tuple) -> bytes:
+    """
+    Signe un message avec la clé privée (de préférence sous forme CRT).
+
+    Args:
+        message: Le message (voir hash_message)
+        private_key: La clé privée (n, d) ou (n, d, p, q, dp, dq, qinv)
+
+    Returns:
+        La signature, sur la taille du module en octets
+    """
+    n = private_key[0]
+    block_size = RSA.modulus_byte_length(n)
+    em = encode_digest(hash_message(message), block_size)
+    s = RSA.rsa_decrypt(int.from_bytes(em, 'big'), private_key)
+    return s.to_bytes(block_size, 'big')
+
+
+def verify(message, signature: bytes, public_key: tuple) -> bool:
+    """
+    Vérifie la signature d'un message.
+
+    Args:
+        message: Le message (voir hash_message)
+        signature: La signature à vérifier
+        public_key: La clé publique (n, e)
+
+    Returns:
+        True si la signature est valide
+    """
+    n, _ = public_key
+    block_size = RSA.modulus_byte_length(n)
+    s = int.from_bytes(signature, 'big')
+    if len(signature) != block_size or s >= n:
+        return False
+    em = RSA.rsa_encrypt(s, public_key).to_bytes(block_size, 'big')
+    return em == encode_digest(hash_message(message), block_size)
+
+
+def _verify_group(public_key: tuple, items: list) -> list:
+    """
+    Vérifie une liste de (empreinte, signature) sous une même clé.
+
+    L'en-tête de EM est converti une seule fois en entier décalé : EM vaut
+    alors prefix_int + int(empreinte), sans reconstruire d'octets.
+    """
+    n, e = public_key
+    block_size = RSA.modulus_byte_length(n)
+    prefix_int = int.from_bytes(_encoded_prefix(block_size), 'big') << (8 * DIGEST_SIZE)
+
+    results = []
+    for digest, signature in items:
+        s = int.from_bytes(signature, 'big')
+        if len(signature) != block_size or s >= n:
+            results.append(False)
+        else:
+            results.append(pow(s, e, n) == prefix_int + int.from_bytes(digest, 'big'))
+    return results
+
+
+def verify_batch(records, public_key: tuple = None, workers: int = None) -> list:
+    """
+    Vérifie un grand nombre de signatures.
+
+    Args:
+        records: Un itérable de (message, signature), ou de
+                 (message, signature, clé_publique) si les clés diffèrent
+        public_key: La clé publique commune, si les enregistrements n'en
+                    précisent pas
+        workers: Le nombre de processus (None = automatique, 1 = séquentiel)
+
+    Returns:
+        La liste des résultats (True/False), dans l'ordre des enregistrements
+    """
+    # Hachage au fil de l'eau et regroupement par clé : clé -> [(indice, empreinte, signature)]
+    groups = {}
+    count = 0
+    for record in records:
+        message, signature = record[0], record[1]
+        key = tuple(record[2]) if len(record) > 2 else public_key
+        if key is None:
+            raise ValueError("Aucune clé publique pour cet enregistrement")
+        groups.setdefault(key, []).append((count, hash_message(message), bytes(signature)))
+        count += 1
+
+    if workers is None:
+        workers = os.cpu_count() if count >= PARALLEL_MIN_RECORDS else 1
+
+    # Découper les groupes en tâches de taille comparable
+    tasks = []
+    task_size = max(1, -(-count // (workers * 4)))
+    for key, entries in groups.items():
+        for i in range(0, len(entries), task_size):
+            tasks.append((key, entries[i:i + task_size]))
+
+    keys = [key for key, _ in tasks]
+    payloads = [[(digest, signature) for _, digest, signature in entries]
+                for _, entries in tasks]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_verify_group, keys, payloads))
+    else:
+        outcomes = list(map(_verify_group, keys, payloads))
+
+    results = [False] * count
+    for (_, entries), outcome in zip(tasks, outcomes):
+        for (index, _, _), valid in zip(entries, outcome):
+            results[index] = valid
+    return results
+
+
+def benchmark(keysize: int = 2048, count: int = 5000) -> None:
+    """
+    Compare verify_batch à des appels verify un par un.
+
+    Args:
+        keysize: La taille de la clé RSA en bits
+        count: Le nombre d'enregistrements signés
+    """
+    public_key, private_key = RSA.rsa_keygen(keysize, crt=True)
+    records = [f"enregistrement {i}: montant={i * 7 % 1000}".encode('utf-8')
+               for i in range(count)]
+
+    start = time.perf_counter()
+    signatures = [sign(record, private_key) for record in records]
+    signing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive = [verify(record, signature, public_key)
+             for record, signature in zip(records, signatures)]
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = verify_batch(list(zip(records, signatures)), public_key)
+    batch_time = time.perf_counter() - start
+
+    print(f"{count} enregistrements, clé de {keysize} bits")
+    print(f"  signature (CRT)   : {count / signing:10.0f} signatures/s")
+    print(f"  verify un par un  : {count / naive_time:10.0f} vérifications/s")
+    print(f"  verify_batch      : {count / batch_time:10.0f} vérifications/s "
+          f"(x{naive_time / batch_time:.1f})")
+    print(f"  résultats identiques: {naive == batch and all(batch)}")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    public_key, private_key = RSA.rsa_keygen(1024, crt=True)
+    message = b"Virement de 100 euros vers le compte 42"
+
+    signature = sign(message, private_key)
+    print(f"Signature (hex): {signature.hex()[:64]}...")
+    print(f"Signature valide: {verify(message, signature, public_key)}")
+    print(f"Message modifié valide: {verify(message + b'0', signature, public_key)}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
@@ -0,0 +1,502 @@
+"""
+Statistiques de fréquence incrémentales pour la cryptanalyse.
+
+Casser ou auditer les chiffrements classiques (César, substitution, XOR)
+demande des histogrammes de lettres, de bigrammes ou d'octets sur de grands
+volumes de texte chiffré. FrequencyStats les met à jour morceau par
+morceau :
+- chaque n-gramme est codé par un entier (base 26 pour les lettres, 256
+  pour les octets) et compté avec numpy.bincount (Counter sinon) ;
+- les n-1 derniers symboles d'un morceau sont conservés, de sorte que les
+  n-grammes à cheval sur deux morceaux sont comptés ;
+- des statistiques partielles calculées en parallèle sur des parties
+  consécutives se fusionnent exactement (merge), n-grammes de la
+  frontière compris ;
+- l'indice de coïncidence, l'entropie et le chi-deux sont tenus à jour par
+  des sommes courantes (somme des c², des c·log c) : leur lecture est en O(1).
+
+C'est aussi le module de notation commun aux attaques : table des
+fréquences du français, poids par octet (cryptanalyse_xor), scores des
+256 clés XOR et des 26 décalages de César.
+"""
+
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy est optionnel : accélère le comptage des n-grammes
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Fréquences approximatives (en %) des caractères dans un texte français,
+# espace compris. Utilisées pour noter les candidats de clé.
+FRENCH_FREQUENCIES = {
+    ' ': 17.0,
+    'e': 12.1, 'a': 6.8, 's': 6.6, 'i': 6.2, 'n': 5.9, 't': 5.9,
+    'r': 5.5, 'u': 5.2, 'l': 4.5, 'o': 4.4, 'd': 3.0, 'c': 2.7,
+    'm': 2.4, 'p': 2.4, 'v': 1.3, 'q': 1.1, 'f': 0.9, 'b': 0.8,
+    'g': 0.8, 'h': 0.6, 'j': 0.4, 'x': 0.3, 'y': 0.2, 'z': 0.1,
+    'k': 0.05, 'w': 0.05,
+    '.': 1.0, ',': 1.0, "'": 0.8, '\n': 0.5,
+}
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# Fréquences des 26 lettres seules, normalisées (somme = 1)
+_letter_total = sum(FRENCH_FREQUENCIES[c] for c in ALPHABET)
+FRENCH_LETTER_PROBABILITIES = [FRENCH_FREQUENCIES[c] / _letter_total for c in ALPHABET]
+
+
+def _build_byte_weights() -> list:
+    """
+    Construit la table des 256 poids (log-probabilités) par valeur d'octet.
+
+    Les majuscules reprennent la fréquence des minuscules divisée par dix,
+    les autres caractères imprimables reçoivent un petit poids et les
+    octets de contrôle une forte pénalité.
+
+    Returns:
+        Une liste de 256 flottants
+    """
+    weights = []
+    for b in range(256):
+        char = chr(b)
+        if char in FRENCH_FREQUENCIES:
+            weights.append(math.log(FRENCH_FREQUENCIES[char] / 100))
+        elif char.lower() in FRENCH_FREQUENCIES:
+            # Majuscule : environ dix fois plus rare que la minuscule
+            weights.append(math.log(FRENCH_FREQUENCIES[char.lower()] / 1000))
+        elif 32 <= b < 127:
+            weights.append(math.log(0.0005))
+        elif b >= 128:
+            # Octets UTF-8 des caractères accentués : rares mais valides
+            weights.append(math.log(0.0002))
+        else:
+            weights.append(-20.0)
+    return weights
+
+
+BYTE_WEIGHTS = _build_byte_weights()
+
+# Probabilités de référence par octet (poids normalisés), pour le chi-deux
+_byte_total = sum(math.exp(w) for w in BYTE_WEIGHTS)
+BYTE_PROBABILITIES = [math.exp(w) / _byte_total for w in BYTE_WEIGHTS]
+
+# Traduction octet -> lettre (0 à 25), les autres octets étant supprimés
+_LETTER_TABLE = bytes((b | 0x20) - ord('a') if chr(b).isascii() and chr(b).isalpha() else 0
+                      for b in range(256))
+_NON_LETTERS = bytes(b for b in range(256) if not (chr(b).isascii() and chr(b).isalpha()))
+
+# Taille maximale d'une table de comptage (base ** ordre)
+MAX_TABLE_SIZE = 1 << 20
+
+if NUMPY_AVAILABLE:
+    _WEIGHTS_NP = np.array(BYTE_WEIGHTS, dtype=np.float64)
+    # _XOR_TABLE[k, b] = b ^ k : permutation de l'histogramme pour la clé k
+    _XOR_TABLE = np.arange(256)[:, None] ^ np.arange(256)[None, :]
+
+
+def _xlogx(values):
+    """c · ln c, avec 0 · ln 0 = 0 (tableau numpy)."""
+    return values * np.log(np.maximum(values, 1))
+
+
+class FrequencyStats:
+    """
+    Histogrammes de n-grammes mis à jour en flux, avec statistiques en O(1).
+
+    Exemple :
+        stats = FrequencyStats("letters", orders=(1, 2, 4))
+        for chunk in morceaux:
+            stats.update(chunk)
+        stats.index_of_coincidence(), stats.entropy(2), stats.chi_squared()
+    """
+
+    def __init__(self, alphabet: str = "letters", orders: tuple = (1, 2)):
+        """
+        Args:
+            alphabet: "letters" (26 lettres, casse ignorée, autres octets
+                      ignorés) ou "bytes" (256 valeurs d'octet)
+            orders: Les tailles de n-grammes comptées
+
+        Raises:
+            ValueError: Si une table de comptage serait trop grande
+        """
+        if alphabet not in ("letters", "bytes"):
+            raise ValueError(f"Alphabet inconnu: {alphabet}")
+        self.alphabet = alphabet
+        self.base = 26 if alphabet == "letters" else 256
+        self.orders = tuple(sorted(set(orders)))
+        for order in self.orders:
+            if order < 1 or self.base ** order > MAX_TABLE_SIZE:
+                raise ValueError(f"Ordre {order} non supporté pour l'alphabet {alphabet}")
+        self._context = self.orders[-1] - 1
+
+        reference = FRENCH_LETTER_PROBABILITIES if alphabet == "letters" else BYTE_PROBABILITIES
+        size = {order: self.base ** order for order in self.orders}
+        if NUMPY_AVAILABLE:
+            self._counts = {order: np.zeros(size[order], dtype=np.int64) for order in self.orders}
+            self._inverse_reference = 1 / np.array(reference, dtype=np.float64)
+        else:
+            self._counts = {order: [0] * size[order] for order in self.orders}
+            self._inverse_reference = [1 / p for p in reference]
+
+        # Sommes courantes par ordre : nombre de n-grammes, somme des c², somme des c·ln c
+        self._totals = dict.fromkeys(self.orders, 0)
+        self._sum_squares = dict.fromkeys(self.orders, 0)
+        self._sum_xlogx = dict.fromkeys(self.orders, 0.0)
+        # Somme des c² / p (unigrammes) pour le chi-deux
+        self._weighted_squares = 0.0
+
+        # Premiers et derniers symboles vus (jusqu'à ordre max - 1)
+        self._head = b""
+        self._tail = b""
+
+    def _symbols(self, chunk) -> bytes:
+        """Convertit un morceau d'octets en symboles (0-25 pour les lettres)."""
+        if self.alphabet == "letters":
+            return bytes(chunk).translate(_LETTER_TABLE, _NON_LETTERS)
+        return bytes(chunk)
+
+    def _add_ngrams(self, data: bytes, order: int, first: int, last: int) -> None:
+        """
+        Compte les n-grammes de data qui commencent entre first et last (inclus)
+        et met à jour les sommes courantes sur les cases modifiées seulement.
+        """
+        if last < first:
+            return
+        counts = self._counts[order]
+        base = self.base
+
+        if NUMPY_AVAILABLE:
+            symbols = np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+            codes = np.zeros(last - first + 1, dtype=np.int64)
+            for k in range(order):
+                codes = codes * base + symbols[first + k:last + 1 + k]
+            histogram = np.bincount(codes, minlength=counts.size)
+            index = np.flatnonzero(histogram)
+            old = counts[index]
+            new = old + histogram[index]
+            self._sum_squares[order] += int((new * new - old * old).sum())
+            self._sum_xlogx[order] += float((_xlogx(new) - _xlogx(old)).sum())
+            if order == 1:
+                self._weighted_squares += float(((new * new - old * old)
+                                                 * self._inverse_reference[index]).sum())
+            counts[index] = new
+        else:
+            window = data[first:last + order]
+            if order == 1:
+                histogram = Counter(window)
+            else:
+                histogram = Counter()
+                for gram, count in Counter(zip(*(window[k:] for k in range(order)))).items():
+                    code = 0
+                    for symbol in gram:
+                        code = code * base + symbol
+                    histogram[code] = count
+            for code, added in histogram.items():
+                old = counts[code]
+                new = old + added
+                self._sum_squares[order] += new * new - old * old
+                self._sum_xlogx[order] += new * math.log(new) - (old * math.log(old) if old else 0.0)
+                if order == 1:
+                    self._weighted_squares += (new * new - old * old) * self._inverse_reference[code]
+                counts[code] = new
+
+        self._totals[order] += last - first + 1
+
+    def update(self, chunk) -> None:
+        """
+        Ajoute un morceau de texte (octets) aux statistiques.
+
+        Args:
+            chunk: Des octets (bytes, bytearray ou memoryview)
+        """
+        symbols = self._symbols(chunk)
+        if not symbols:
+            return
+        # Les n-grammes comptés sont ceux qui se terminent dans le nouveau morceau
+        data = self._tail + symbols
+        offset = len(self._tail)
+        for order in self.orders:
+            self._add_ngrams(data, order, max(0, offset - order + 1), len(data) - order)
+
+        if len(self._head) < self._context:
+            self._head = (self._head + symbols)[:self._context]
+        self._tail = data[-self._context:] if self._context else b""
+
+    def merge(self, other: "FrequencyStats") -> "FrequencyStats":
+        """
+        Fusionne les statistiques de la partie qui suit immédiatement celle-ci.
+
+        Les n-grammes à cheval sur la frontière (fin de self, début de
+        other) sont ajoutés : fusionner dans l'ordre les statistiques de
+        parties consécutives donne exactement celles du texte entier.
+
+        Args:
+            other: Les statistiques de la partie suivante (mêmes réglages)
+
+        Returns:
+            self, modifié
+        """
+        if (other.alphabet, other.orders) != (self.alphabet, self.orders):
+            raise ValueError("Statistiques incompatibles")
+
+        for order in self.orders:
+            if NUMPY_AVAILABLE:
+                self._counts[order] += other._counts[order]
+                counts = self._counts[order]
+                self._sum_squares[order] = int((counts * counts).sum())
+                self._sum_xlogx[order] = float(_xlogx(counts).sum())
+            else:
+                counts = self._counts[order]
+                for code, count in enumerate(other._counts[order]):
+                    if count:
+                        counts[code] += count
+                self._sum_squares[order] = sum(c * c for c in counts if c)
+                self._sum_xlogx[order] = sum(c * math.log(c) for c in counts if c)
+            self._totals[order] += other._totals[order]
+        unigrams = self._counts.get(1)
+        if unigrams is not None:
+            self._weighted_squares = float(sum(c * c * w for c, w in zip(unigrams, self._inverse_reference)))
+
+        # N-grammes de la frontière : début dans self._tail, fin dans other._head
+        boundary = self._tail + other._head
+        split = len(self._tail)
+        for order in self.orders:
+            self._add_ngrams(boundary, order, max(0, split - order + 1),
+                             min(split - 1, len(boundary) - order))
+
+        if len(self._head) < self._context:
+            self._head = (self._head + other._head)[:self._context]
+        if self._context:
+            self._tail = (self._tail + other._tail)[-self._context:]
+        return self
+
+    def total(self, order: int = 1) -> int:
+        """Nombre de n-grammes comptés pour un ordre."""
+        return self._totals[order]
+
+    def counts(self, order: int = 1) -> list:
+        """
+        Renvoie l'histogramme d'un ordre (indice = code du n-gramme).
+
+        Args:
+            order: La taille des n-grammes
+
+        Returns:
+            Une liste de base ** order effectifs
+        """
+        counts = self._counts[order]
+        return counts.tolist() if NUMPY_AVAILABLE else list(counts)
+
+    def decode(self, code: int, order: int):
+        """Retrouve le n-gramme (str pour les lettres, bytes sinon) d'un code."""
+        symbols = []
+        for _ in range(order):
+            code, symbol = divmod(code, self.base)
+            symbols.append(symbol)
+        symbols.reverse()
+        if self.alphabet == "letters":
+            return "".join(ALPHABET[s] for s in symbols)
+        return bytes(symbols)
+
+    def most_common(self, order: int = 1, n: int = 10) -> list:
+        """
+        Renvoie les n-grammes les plus fréquents.
+
+        Args:
+            order: La taille des n-grammes
+            n: Le nombre de résultats
+
+        Returns:
+            Une liste de (n-gramme, effectif)
+        """
+        counts = self.counts(order)
+        best = sorted(range(len(counts)), key=counts.__getitem__, reverse=True)[:n]
+        return [(self.decode(code, order), counts[code]) for code in best if counts[code]]
+
+    def index_of_coincidence(self, order: int = 1) -> float:
+        """
+        Probabilité que deux n-grammes tirés au hasard soient identiques.
+
+        Environ 0,078 pour les lettres d'un texte français, 1/26 ≈ 0,038
+        pour des lettres uniformes. César et substitution le conservent.
+        """
+        total = self._totals[order]
+        if total < 2:
+            return 0.0
+        return (self._sum_squares[order] - total) / (total * (total - 1))
+
+    def entropy(self, order: int = 1) -> float:
+        """Entropie de Shannon (en bits par n-gramme) de la distribution observée."""
+        total = self._totals[order]
+        if total == 0:
+            return 0.0
+        return math.log2(total) - self._sum_xlogx[order] / (total * math.log(2))
+
+    def chi_squared(self) -> float:
+        """
+        Chi-deux des unigrammes par rapport à la référence française
+        (lettres ou octets selon l'alphabet). Plus il est petit, plus le
+        texte ressemble à du français en clair.
+        """
+        total = self._totals.get(1, 0)
+        if total == 0:
+            return 0.0
+        return self._weighted_squares / total - total
+
+    def xor_key_scores(self) -> list:
+        """
+        Log-vraisemblance du texte déchiffré pour chacune des 256 clés XOR
+        d'un octet (alphabet "bytes"). Le déchiffrement par k revient à
+        permuter l'histogramme (b -> b ^ k) : aucun octet n'est redéchiffré.
+
+        Returns:
+            Une liste de 256 scores (le plus grand est le meilleur)
+        """
+        if self.alphabet != "bytes" or 1 not in self.orders:
+            raise ValueError("Scores XOR disponibles pour l'alphabet bytes, ordre 1")
+        counts = self._counts[1]
+        if NUMPY_AVAILABLE:
+            return (counts[_XOR_TABLE].astype(np.float64) @ _WEIGHTS_NP).tolist()
+        present = [(b, c) for b, c in enumerate(counts) if c]
+        return [sum(c * BYTE_WEIGHTS[b ^ k] for b, c in present) for k in range(256)]
+
+    def caesar_shift_scores(self) -> list:
+        """
+        Chi-deux par rapport au français pour chacun des 26 décalages de
+        César (alphabet "letters"), calculé sur l'histogramme décalé.
+
+        Returns:
+            Une liste de 26 scores (le plus petit est le meilleur)
+        """
+        if self.alphabet != "letters" or 1 not in self.orders:
+            raise ValueError("Scores César disponibles pour l'alphabet letters, ordre 1")
+        counts = self.counts(1)
+        total = self._totals[1]
+        if total == 0:
+            return [0.0] * 26
+        scores = []
+        for shift in range(26):
+            # Déchiffrer par shift : la lettre chiffrée c devient c - shift
+            squares = sum(counts[(i + shift) % 26] ** 2 / p
+                          for i, p in enumerate(FRENCH_LETTER_PROBABILITIES))
+            scores.append(squares / total - total)
+        return scores
+
+
+def _analyze_range(path: str, offset: int, length: int, alphabet: str, orders: tuple,
+                   chunk_size: int) -> FrequencyStats:
+    """Calcule les statistiques d'une partie de fichier (exécuté dans un processus)."""
+    stats = FrequencyStats(alphabet, orders)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            stats.update(chunk)
+            remaining -= len(chunk)
+    return stats
+
+
+def analyze_file(path: str, alphabet: str = "letters", orders: tuple = (1, 2),
+                 workers: int = None, chunk_size: int = 1 << 20) -> FrequencyStats:
+    """
+    Calcule les statistiques d'un fichier, par parties en parallèle.
+
+    Args:
+        path: Le chemin du fichier
+        alphabet: "letters" ou "bytes"
+        orders: Les tailles de n-grammes
+        workers: Le nombre de processus (None = nombre de cœurs)
+        chunk_size: La taille des morceaux lus
+
+    Returns:
+        Les statistiques du fichier entier
+    """
+    size = os.path.getsize(path)
+    if workers is None:
+        workers = os.cpu_count()
+    parts = max(1, min(workers, size // chunk_size))
+    step = -(-size // parts) if size else 1
+    ranges = [(offset, min(step, size - offset)) for offset in range(0, size, step)]
+    if len(ranges) <= 1:
+        return _analyze_range(path, 0, size, alphabet, orders, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(_analyze_range, [path] * len(ranges),
+                                 [o for o, _ in ranges], [n for _, n in ranges],
+                                 [alphabet] * len(ranges), [orders] * len(ranges),
+                                 [chunk_size] * len(ranges)))
+    result = partials[0]
+    for partial in partials[1:]:
+        result.merge(partial)
+    return result
+
+
+def benchmark(size: int = 8 << 20) -> None:
+    """
+    Compare le comptage en flux à une boucle Python naïve sur un texte chiffré.
+
+    Args:
+        size: La taille du texte en octets
+    """
+    import time
+
+    import cesar_cypher
+
+    sample = ("Les statistiques de fréquence permettent de casser les chiffrements "
+              "classiques : lettres, bigrammes et quadrigrammes suffisent.\n")
+    text = cesar_cypher.cesar_encrypt(sample, 7).encode('utf-8')
+    data = (text * (size // len(text) + 1))[:size]
+
+    start = time.perf_counter()
+    naive = Counter()
+    letters = [c for c in data.decode('utf-8', errors='ignore').lower() if 'a' <= c <= 'z']
+    for i in range(len(letters) - 1):
+        naive[letters[i] + letters[i + 1]] += 1
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = FrequencyStats("letters", orders=(1, 2))
+    for i in range(0, len(data), 1 << 16):
+        stats.update(data[i:i + (1 << 16)])
+    stream_time = time.perf_counter() - start
+
+    backend = "numpy" if NUMPY_AVAILABLE else "python"
+    print(f"Texte de {size >> 20} Mo, bigrammes de lettres ({backend})")
+    print(f"  boucle Python : {size / naive_time / (1 << 20):8.1f} Mo/s")
+    print(f"  FrequencyStats: {size / stream_time / (1 << 20):8.1f} Mo/s "
+          f"(x{naive_time / stream_time:.1f})")
+    print(f"  mêmes bigrammes: {stats.most_common(2, 5) == [(g, naive[g]) for g, _ in stats.most_common(2, 5)]}")
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    import cesar_cypher
+
+    message = ("Bonjour, ceci est un message secret! Il est assez long pour que "
+               "l'analyse de fréquence retrouve le décalage utilisé par César.")
+    chiffre = cesar_cypher.cesar_encrypt(message, 11).encode('utf-8')
+
+    stats = FrequencyStats("letters", orders=(1, 2, 4))
+    for i in range(0, len(chiffre), 16):
+        stats.update(chiffre[i:i + 16])
+
+    scores = stats.caesar_shift_scores()
+    print(f"Indice de coïncidence : {stats.index_of_coincidence():.4f}")
+    print(f"Entropie (lettres)    : {stats.entropy():.3f} bits")
+    print(f"Chi-deux (chiffré)    : {stats.chi_squared():.1f}")
+    print(f"Bigrammes fréquents   : {stats.most_common(2, 5)}")
+    print(f"Décalage retrouvé     : {scores.index(min(scores))}")
+
+    print("\n" + "=" * 50 + "\n")
+    benchmark()
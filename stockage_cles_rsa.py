@@ -0,0 +1,384 @@
+"""
+Sérialisation binaire compacte et stockage persistant des clés RSA.
+
+`RSA.rsa_keygen` renvoie de simples tuples : ce module permet de les
+enregistrer et de les recharger sans les régénérer.
+
+Format d'une paire de clés (entiers en big-endian) :
+    "RSAK" | version (1 octet) | nombre de champs (1 octet)
+    puis pour chaque champ : longueur (2 octets) | valeur
+Les champs sont e, n, puis pour une clé privée d et les éventuels
+paramètres CRT (p, q, dp, dq, qinv).
+
+Le stockage (KeyStore) utilise deux fichiers :
+- <chemin>.dat : les enregistrements, ajoutés les uns à la suite des autres
+- <chemin>.idx : une table de hachage à adressage ouvert, de taille fixe,
+  projetée en mémoire (mmap). Une recherche par identifiant ne lit qu'une
+  case de la table puis l'enregistrement correspondant, sans parcourir le
+  fichier : O(1) même avec des milliers de clés.
+Les clés ne sont décodées qu'à leur première utilisation puis gardées en
+cache. Un seul processus doit écrire dans un stockage à la fois.
+
+Les exposants privés sont écrits en clair : les deux fichiers sont créés
+avec les droits 0o600 (lecture et écriture pour le seul propriétaire,
+quel que soit le umask). Les droits d'un fichier existant ne sont pas
+modifiés.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+KEY_MAGIC = b"RSAK"
+KEY_VERSION = 1
+
+INDEX_MAGIC = b"RSAI"
+INDEX_VERSION = 1
+# En-tête de l'index : magic, version, capacité, nombre de clés
+INDEX_HEADER = struct.Struct(">4sB3xQQ")
+# Case de l'index : identifiant, position et longueur de l'enregistrement
+INDEX_SLOT = struct.Struct(">16sQI4x")
+# Taux de remplissage au-delà duquel l'index est agrandi
+MAX_LOAD_FACTOR = 0.7
+
+KEY_ID_SIZE = 16
+_EMPTY_ID = bytes(KEY_ID_SIZE)
+
+# Droits des fichiers créés : propriétaire seulement
+FILE_MODE = 0o600
+
+
+def _int_to_field(value: int) -> bytes:
+    """Encode un entier positif en champ (longueur sur 2 octets + valeur)."""
+    raw = value.to_bytes(max(1, (value.bit_length() + 7) // 8), 'big')
+    if len(raw) > 0xFFFF:
+        raise ValueError("Entier trop grand pour être sérialisé")
+    return struct.pack(">H", len(raw)) + raw
+
+
+def serialize_keys(public_key: tuple, private_key: tuple = None) -> bytes:
+    """
+    Sérialise une clé publique, et éventuellement la clé privée associée.
+
+    Args:
+        public_key: La clé publique (n, e)
+        private_key: La clé privée (n, d, ...) ou None
+
+    Returns:
+        Les octets de l'enregistrement
+
+    Raises:
+        ValueError: Si les deux clés n'ont pas le même module
+    """
+    n, e = public_key
+    fields = [e, n]
+    if private_key is not None:
+        if private_key[0] != n:
+            raise ValueError("La clé privée ne correspond pas à la clé publique")
+        fields.extend(private_key[1:])
+
+    header = KEY_MAGIC + bytes([KEY_VERSION, len(fields)])
+    return header + b"".join(_int_to_field(value) for value in fields)
+
+
+def deserialize_keys(data: bytes) -> tuple:
+    """
+    Relit un enregistrement produit par serialize_keys.
+
+    Args:
+        data: Les octets de l'enregistrement
+
+    Returns:
+        Un tuple (clé_publique, clé_privée) où la clé privée vaut None si
+        l'enregistrement n'en contient pas
+
+    Raises:
+        ValueError: Si l'enregistrement est invalide
+    """
+    data = memoryview(data)
+    if bytes(data[:4]) != KEY_MAGIC or len(data) < 6:
+        raise ValueError("Enregistrement de clé invalide")
+    if data[4] != KEY_VERSION:
+        raise ValueError(f"Version de format non supportée: {data[4]}")
+
+    fields = []
+    offset = 6
+    for _ in range(data[5]):
+        if offset + 2 > len(data):
+            raise ValueError("Enregistrement de clé tronqué")
+        (length,) = struct.unpack_from(">H", data, offset)
+        offset += 2
+        if offset + length > len(data):
+            raise ValueError("Enregistrement de clé tronqué")
+        fields.append(int.from_bytes(data[offset:offset + length], 'big'))
+        offset += length
+
+    if len(fields) < 2:
+        raise ValueError("Enregistrement de clé incomplet")
+    e, n = fields[0], fields[1]
+    private_key = (n, *fields[2:]) if len(fields) > 2 else None
+    return (n, e), private_key
+
+
+def key_id(public_key: tuple) -> bytes:
+    """
+    Calcule l'identifiant d'une clé : SHA-256 de (n, e), tronqué à 16 octets.
+
+    Args:
+        public_key: La clé publique (n, e)
+
+    Returns:
+        L'identifiant de 16 octets
+    """
+    return hashlib.sha256(serialize_keys(public_key)).digest()[:KEY_ID_SIZE]
+
+
+def key_id_from_name(name: str) -> bytes:
+    """
+    Calcule un identifiant à partir d'un nom choisi (par ex. "serveur-web").
+
+    Args:
+        name: Le nom de la clé
+
+    Returns:
+        L'identifiant de 16 octets
+    """
+    return hashlib.sha256(name.encode('utf-8')).digest()[:KEY_ID_SIZE]
+
+
+class KeyStore:
+    """
+    Stockage de clés RSA indexé par identifiant, projeté en mémoire.
+
+    Exemple:
+        with KeyStore("mes_cles") as store:
+            kid = store.put(public_key, private_key)
+            public_key, private_key = store.get(kid)
+    """
+
+    def __init__(self, path: str, initial_capacity: int = 1024):
+        """
+        Ouvre (ou crée) le stockage.
+
+        Args:
+            path: Le chemin des fichiers, sans extension
+            initial_capacity: Le nombre de cases de l'index à la création
+        """
+        self.data_path = path + ".dat"
+        self.index_path = path + ".idx"
+        self._cache = {}
+        self._data_map = None
+
+        if not os.path.exists(self.index_path):
+            _create_index(self.index_path, max(8, initial_capacity))
+        self._data_file = _open_private(self.data_path, os.O_RDWR | os.O_CREAT, 'r+b')
+        self._open_index()
+
+    def _open_index(self) -> None:
+        """Projette le fichier d'index en mémoire et lit son en-tête."""
+        self._index_file = open(self.index_path, 'r+b')
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        magic, version, capacity, count = INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Fichier d'index invalide: {self.index_path}")
+        self.capacity = capacity
+        self.count = count
+
+    def _close_index(self) -> None:
+        self._index.close()
+        self._index_file.close()
+
+    def _find_slot(self, kid: bytes) -> tuple:
+        """
+        Cherche la case d'un identifiant (sondage linéaire).
+
+        Returns:
+            Un tuple (numéro_de_case, trouvé)
+        """
+        slot = int.from_bytes(kid[:8], 'big') % self.capacity
+        while True:
+            stored_id, _, _ = INDEX_SLOT.unpack_from(self._index, _slot_offset(slot))
+            if stored_id == kid:
+                return slot, True
+            if stored_id == _EMPTY_ID:
+                return slot, False
+            slot = (slot + 1) % self.capacity
+
+    def _read_record(self, offset: int, length: int) -> bytes:
+        """Lit un enregistrement du fichier de données via mmap."""
+        if self._data_map is None or offset + length > len(self._data_map):
+            # Le fichier a grandi depuis la dernière projection
+            if self._data_map is not None:
+                self._data_map.close()
+            self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map[offset:offset + length]
+
+    def __contains__(self, kid: bytes) -> bool:
+        return self._find_slot(kid)[1]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, kid: bytes) -> tuple:
+        return self.get(kid)
+
+    def get(self, kid: bytes) -> tuple:
+        """
+        Charge une paire de clés (décodée à la première demande seulement).
+
+        Args:
+            kid: L'identifiant de la clé
+
+        Returns:
+            Un tuple (clé_publique, clé_privée ou None)
+
+        Raises:
+            KeyError: Si l'identifiant est inconnu
+        """
+        if kid in self._cache:
+            return self._cache[kid]
+        slot, found = self._find_slot(kid)
+        if not found:
+            raise KeyError(kid.hex())
+        _, offset, length = INDEX_SLOT.unpack_from(self._index, _slot_offset(slot))
+        keys = deserialize_keys(self._read_record(offset, length))
+        self._cache[kid] = keys
+        return keys
+
+    def put(self, public_key: tuple, private_key: tuple = None, kid: bytes = None) -> bytes:
+        """
+        Ajoute (ou remplace) une paire de clés.
+
+        Args:
+            public_key: La clé publique (n, e)
+            private_key: La clé privée, ou None pour ne stocker que la clé publique
+            kid: L'identifiant (par défaut : key_id(public_key))
+
+        Returns:
+            L'identifiant sous lequel la clé est enregistrée
+        """
+        if kid is None:
+            kid = key_id(public_key)
+        if len(kid) != KEY_ID_SIZE or kid == _EMPTY_ID:
+            raise ValueError(f"L'identifiant doit faire {KEY_ID_SIZE} octets non tous nuls")
+
+        record = serialize_keys(public_key, private_key)
+        self._data_file.seek(0, os.SEEK_END)
+        offset = self._data_file.tell()
+        self._data_file.write(record)
+        self._data_file.flush()
+
+        slot, found = self._find_slot(kid)
+        if not found and self.count + 1 > self.capacity * MAX_LOAD_FACTOR:
+            self._grow()
+            slot, found = self._find_slot(kid)
+
+        INDEX_SLOT.pack_into(self._index, _slot_offset(slot), kid, offset, len(record))
+        if not found:
+            self.count += 1
+            INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, INDEX_VERSION,
+                                   self.capacity, self.count)
+        self._cache[kid] = (tuple(public_key), tuple(private_key) if private_key else None)
+        return kid
+
+    def ids(self) -> list:
+        """
+        Liste les identifiants enregistrés, sans décoder les clés.
+
+        Returns:
+            La liste des identifiants
+        """
+        result = []
+        for slot in range(self.capacity):
+            stored_id, _, _ = INDEX_SLOT.unpack_from(self._index, _slot_offset(slot))
+            if stored_id != _EMPTY_ID:
+                result.append(stored_id)
+        return result
+
+    def _grow(self) -> None:
+        """Double la capacité de l'index en réinsérant toutes les cases."""
+        entries = [INDEX_SLOT.unpack_from(self._index, _slot_offset(slot))
+                   for slot in range(self.capacity)]
+        new_capacity = self.capacity * 2
+        tmp_path = self.index_path + ".tmp"
+        _create_index(tmp_path, new_capacity)
+
+        with open(tmp_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as index:
+            for stored_id, offset, length in entries:
+                if stored_id == _EMPTY_ID:
+                    continue
+                slot = int.from_bytes(stored_id[:8], 'big') % new_capacity
+                while INDEX_SLOT.unpack_from(index, _slot_offset(slot))[0] != _EMPTY_ID:
+                    slot = (slot + 1) % new_capacity
+                INDEX_SLOT.pack_into(index, _slot_offset(slot), stored_id, offset, length)
+            INDEX_HEADER.pack_into(index, 0, INDEX_MAGIC, INDEX_VERSION,
+                                   new_capacity, self.count)
+
+        self._close_index()
+        os.replace(tmp_path, self.index_path)
+        self._open_index()
+
+    def close(self) -> None:
+        """Ferme les fichiers du stockage."""
+        if self._data_map is not None:
+            self._data_map.close()
+            self._data_map = None
+        self._index.flush()
+        self._close_index()
+        self._data_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _slot_offset(slot: int) -> int:
+    """Position d'une case dans le fichier d'index."""
+    return INDEX_HEADER.size + slot * INDEX_SLOT.size
+
+
+def _open_private(path: str, flags: int, mode: str):
+    """Ouvre un fichier binaire, créé s'il le faut avec les droits FILE_MODE."""
+    return os.fdopen(os.open(path, flags, FILE_MODE), mode)
+
+
+def _create_index(path: str, capacity: int) -> None:
+    """Crée un fichier d'index vide de `capacity` cases."""
+    with _open_private(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, capacity, 0))
+        f.truncate(_slot_offset(capacity))
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import RSA
+
+    public_key, private_key = RSA.rsa_keygen(512)
+    record = serialize_keys(public_key, private_key)
+    print(f"Paire de clés 512 bits sérialisée en {len(record)} octets")
+    print(f"Relecture identique: {deserialize_keys(record) == (public_key, private_key)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cles")
+
+        # Remplir le stockage avec des milliers de clés (fictives, pour la démo)
+        start = time.perf_counter()
+        with KeyStore(path) as store:
+            ids = [store.put((n | 1, 65537), (n | 1, n // 3))
+                   for n in range(1 << 511, (1 << 511) + 5000 * 7919, 7919)]
+            kid = store.put(public_key, private_key)
+        print(f"\n{len(ids) + 1} clés enregistrées en {time.perf_counter() - start:.2f} s")
+
+        # Réouverture : seul l'enregistrement demandé est lu et décodé
+        with KeyStore(path) as store:
+            start = time.perf_counter()
+            loaded_public, loaded_private = store.get(kid)
+            elapsed = time.perf_counter() - start
+            print(f"Clé retrouvée parmi {len(store)} en {elapsed * 1e6:.0f} µs")
+            print(f"Identique: {(loaded_public, loaded_private) == (public_key, private_key)}")
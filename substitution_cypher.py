@@ -1,6 +1,7 @@
-import random
 import string
 
+import materiel_cles
+
 def generate_random_mapping():
     """
     Génère une table de substitution aléatoire.
@@ -11,7 +12,7 @@ def generate_random_mapping():
     """
     alphabet = list(string.ascii_lowercase)
     shuffled = alphabet.copy()
-    random.shuffle(shuffled)
+    materiel_cles.shuffle(shuffled)  # Fisher-Yates avec un générateur sûr
     
     mapping = {}
     for i, letter in enumerate(alphabet):
@@ -82,6 +83,22 @@ def decrypt(text, reverse_mapping):
     
     return result
 
+def translate(text, mapping):
+    """
+    Substitution par str.translate, pour encrypt comme pour decrypt.
+    
+    Même résultat que encrypt(text, mapping) (ou decrypt avec le mapping
+    inverse), sans concaténation caractère par caractère.
+    
+    Paramètres:
+        text (str): Le texte à transformer
+        mapping (dict): La table de substitution (ou son inverse)
+    
+    Retourne:
+        str: Le texte transformé
+    """
+    return text.translate(str.maketrans(mapping))
+
 
 # === Exemple d'utilisation ===
 if __name__ == "__main__":
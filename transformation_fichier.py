@@ -0,0 +1,220 @@
+"""
+Chiffrement de César / par substitution de très gros fichiers texte.
+
+`cesar_encrypt` et `substitution_cypher.encrypt` prennent une chaîne en
+mémoire : un corpus de plusieurs Go ne peut pas être traité. Ici :
+- les deux chiffrements se ramènent à une table de 256 octets (chaque
+  octet est remplacé par table[octet]), appliquée par bytes.translate ;
+- le fichier d'entrée est projeté en mémoire (mmap) et découpé en
+  intervalles alignés sur mmap.ALLOCATIONGRANULARITY ;
+- chaque processus projette son intervalle de l'entrée et du fichier de
+  sortie (créé à la bonne taille à l'avance) et y écrit directement, par
+  morceaux, sans jamais décoder en str.
+
+Différence avec les fonctions sur str : seuls les octets ASCII A-Z et a-z
+sont transformés. Les caractères non ASCII (é, ç, ... sur plusieurs octets
+en UTF-8) sont recopiés tels quels, alors que cesar_encrypt décale aussi
+les lettres accentuées (isalpha) vers des caractères arbitraires. Le
+fichier chiffré reste donc de l'UTF-8 valide et de même taille.
+"""
+
+import argparse
+import mmap
+import os
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import substitution_cypher
+
+# Taille des morceaux traduits à la fois dans un intervalle
+CHUNK_SIZE = 4 << 20
+
+# Taille minimale d'un intervalle confié à un processus
+MIN_RANGE_SIZE = 16 << 20
+
+# Nombre d'intervalles par processus (équilibrage de charge)
+RANGES_PER_WORKER = 4
+
+
+def byte_table(algo: str, key, operation: str = "encrypt") -> bytes:
+    """
+    Construit la table de 256 octets d'un chiffrement.
+
+    Args:
+        algo: "cesar" ou "substitution"
+        key: Le décalage (César) ou le mapping de chiffrement (substitution)
+        operation: "encrypt" ou "decrypt"
+
+    Returns:
+        La table utilisable par bytes.translate
+    """
+    table = bytearray(range(256))
+    if algo == "cesar":
+        shift = (key if operation == "encrypt" else -key) % 26
+        for alphabet in (string.ascii_lowercase, string.ascii_uppercase):
+            for i, letter in enumerate(alphabet):
+                table[ord(letter)] = ord(alphabet[(i + shift) % 26])
+    elif algo == "substitution":
+        mapping = key if operation == "encrypt" else substitution_cypher.get_reverse_mapping(key)
+        for source, target in mapping.items():
+            if not (source.isascii() and target.isascii() and len(source) == len(target) == 1):
+                raise ValueError("La table de substitution doit porter sur des caractères ASCII")
+            table[ord(source)] = ord(target)
+    else:
+        raise ValueError(f"Algorithme inconnu: {algo}")
+    return bytes(table)
+
+
+def split_ranges(size: int, parts: int, alignment: int = mmap.ALLOCATIONGRANULARITY) -> list:
+    """
+    Découpe [0, size) en intervalles dont les débuts sont alignés.
+
+    mmap exige un décalage multiple de ALLOCATIONGRANULARITY.
+
+    Args:
+        size: La taille du fichier
+        parts: Le nombre d'intervalles souhaité
+        alignment: L'alignement des débuts d'intervalle
+
+    Returns:
+        Une liste de (décalage, longueur)
+    """
+    step = max(alignment, -(-size // max(parts, 1)))
+    step = -(-step // alignment) * alignment
+    return [(offset, min(step, size - offset)) for offset in range(0, size, step)]
+
+
+def _transform_range(src: str, dst: str, offset: int, length: int, table: bytes) -> int:
+    """Traduit un intervalle de src dans le même intervalle de dst (exécuté dans un processus)."""
+    with open(src, 'rb') as fin, open(dst, 'r+b') as fout:
+        with mmap.mmap(fin.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as source, \
+                mmap.mmap(fout.fileno(), length, access=mmap.ACCESS_WRITE, offset=offset) as target:
+            for start in range(0, length, CHUNK_SIZE):
+                end = min(start + CHUNK_SIZE, length)
+                target[start:end] = source[start:end].translate(table)
+    return length
+
+
+def transform_file(src: str, dst: str, table: bytes, workers: int = None,
+                   min_range_size: int = MIN_RANGE_SIZE) -> int:
+    """
+    Applique une table de 256 octets à tout un fichier.
+
+    Args:
+        src: Le fichier d'entrée
+        dst: Le fichier de sortie (créé ou écrasé, à la taille de src)
+        table: La table renvoyée par byte_table
+        workers: Le nombre de processus (None = nombre de cœurs)
+        min_range_size: La taille minimale d'un intervalle confié à un processus
+
+    Returns:
+        Le nombre d'octets traités
+
+    Raises:
+        ValueError: Si src et dst désignent le même fichier (l'ouverture de
+                    dst le viderait avant sa lecture)
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError(f"Le fichier de sortie est le fichier d'entrée: {dst}")
+    size = os.path.getsize(src)
+    with open(dst, 'wb') as fout:
+        fout.truncate(size)
+    if size == 0:
+        return 0
+
+    if workers is None:
+        workers = os.cpu_count()
+    parts = min(workers * RANGES_PER_WORKER, max(1, size // min_range_size))
+    ranges = split_ranges(size, parts)
+
+    if workers <= 1 or len(ranges) == 1:
+        return sum(_transform_range(src, dst, offset, length, table) for offset, length in ranges)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_transform_range, src, dst, offset, length, table)
+                   for offset, length in ranges]
+        return sum(future.result() for future in futures)
+
+
+def benchmark(size: int = 256 << 20, path: str = "/tmp/tp3_corpus") -> None:
+    """
+    Mesure le débit (Mo/s) selon le nombre de processus.
+
+    Args:
+        size: La taille du corpus généré en octets
+        path: Le préfixe des fichiers temporaires
+    """
+    import cesar_cypher
+
+    line = "Le vif zéphyr jubile sur les kiwis que fourre un gros pâté. 0123456789\n".encode('utf-8')
+    block = line * ((1 << 20) // len(line) + 1)
+    src, dst = path + ".txt", path + "_chiffre.txt"
+    with open(src, 'wb') as f:
+        written = 0
+        while written < size:
+            written += f.write(block[:size - written])
+    table = byte_table("cesar", 3)
+
+    # Référence : cesar_encrypt sur 1 Mo, extrapolé
+    sample = block[:1 << 20].decode('utf-8', errors='ignore')
+    start = time.perf_counter()
+    cesar_cypher.cesar_encrypt(sample, 3)
+    reference = len(sample) / (time.perf_counter() - start) / (1 << 20)
+
+    print(f"Corpus de {size >> 20} Mo, cesar_encrypt: {reference:.1f} Mo/s")
+    print(f"{'processus':>10} {'temps (s)':>10} {'Mo/s':>8}")
+    for workers in sorted({1, 2, 4, os.cpu_count()}):
+        start = time.perf_counter()
+        transform_file(src, dst, table, workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>10} {elapsed:>10.2f} {(size >> 20) / elapsed:>8.1f}")
+
+    transform_file(dst, src + ".dechiffre", byte_table("cesar", 3, "decrypt"))
+    with open(src, 'rb') as a, open(src + ".dechiffre", 'rb') as b:
+        print(f"Déchiffrement identique: {a.read() == b.read()}")
+    for file in (src, dst, src + ".dechiffre"):
+        os.remove(file)
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="César / substitution sur de gros fichiers")
+    parser.add_argument("entree", nargs="?", help="Fichier d'entrée")
+    parser.add_argument("sortie", nargs="?", help="Fichier de sortie")
+    parser.add_argument("--algo", choices=("cesar", "substitution"), default="cesar")
+    parser.add_argument("--decalage", type=int, help="Décalage de César")
+    parser.add_argument("--passphrase", help="Phrase de passe (clés dérivées)")
+    parser.add_argument("--sel", help="Sel en hexadécimal, avec --passphrase")
+    parser.add_argument("-d", "--decrypt", action="store_true", help="Déchiffrer")
+    parser.add_argument("--workers", type=int, help="Nombre de processus")
+    parser.add_argument("--benchmark", action="store_true", help="Mesurer le débit")
+    arguments = parser.parse_args(argv)
+
+    if arguments.benchmark:
+        benchmark()
+        return 0
+    if not arguments.entree or not arguments.sortie:
+        parser.error("entree et sortie sont requis")
+
+    if arguments.algo == "cesar" and arguments.decalage is not None:
+        key = arguments.decalage
+    elif arguments.passphrase and arguments.sel:
+        import derivation_cles
+
+        key = derivation_cles.derive_keys(arguments.passphrase, bytes.fromhex(arguments.sel))[arguments.algo]
+    else:
+        parser.error("indiquer --decalage (César) ou --passphrase et --sel")
+
+    table = byte_table(arguments.algo, key, "decrypt" if arguments.decrypt else "encrypt")
+    start = time.perf_counter()
+    size = transform_file(arguments.entree, arguments.sortie, table, arguments.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{size} octets traités en {elapsed:.2f} s -> {arguments.sortie}")
+    return 0
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""
+Vérification différentielle des implémentations rapides contre les
+fonctions de référence, avec mesure de l'accélération.
+
+Une implémentation optimisée ne peut remplacer une fonction de référence
+que si elle renvoie exactement la même chose, bizarreries comprises :
+- cesar_encrypt décale aussi les lettres non ASCII (isalpha) vers a-z/A-Z ;
+- feistel_encrypt code un caractère sur plus de 8 bits au-delà de U+00FF,
+  d'où un bourrage d'un bit quand la longueur binaire est impaire ;
+- xor_encrypt accepte une clé vide si le message est vide ;
+- rsa_encrypt refuse m < 0 et m >= n.
+
+Les fonctions actuelles servent d'oracles (ORACLES). Chaque implémentation
+rapide est enregistrée pour un cas (register_backend), avec éventuellement
+un domaine (par exemple : texte ASCII seulement) ; les entrées hors domaine
+sont ignorées pour elle. Pour chaque cas et chaque taille, des entrées
+aléatoires (reproductibles à partir d'une graine) et des cas limites sont
+générés, puis oracle et implémentations sont exécutés sur les mêmes
+entrées, les tâches étant réparties sur un pool de processus. Le rapport
+donne, par implémentation et par taille, le nombre de divergences et le
+rapport de vitesse. Une exception compte comme un résultat : elle doit
+être du même type que celle de l'oracle.
+
+Les oracles RSA sont figés sur pow (sans get_engine ni CRT) : le chemin
+optimisé de RSA est lui-même une implémentation à vérifier. Le rapport de
+vitesse se mesure après le passage de vérification, qui sert d'échauffement
+(caches, tables, imports) : oracle et implémentation sont chronométrés en
+alternance sur les mêmes entrées, chaque passage répétant les entrées
+jusqu'à TIMING_MIN_SECONDS, et le meilleur de TIMING_REPEAT passages est
+retenu, comme timeit. Le backend "fichier" démarre un pool et écrit un
+fichier par entrée : il est vérifié mais absent du rapport de vitesse (débit
+mesuré par transformation_fichier.benchmark, sur de vrais fichiers).
+
+Les implémentations sont retrouvées par leur nom dans BACKENDS à
+l'intérieur des processus : un backend enregistré hors de ce module doit
+l'être à l'import (démarrage des processus par fork).
+"""
+
+import argparse
+import base64
+import mmap
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cesar_cypher
+import chiffrement_colonnes
+import cryptage_xor
+import feistel_block_cypher_cryptage
+import RSA
+import substitution_cypher
+import transformation_fichier
+from exponentiation_modulaire import GMPY2_AVAILABLE, ModExpEngine
+
+def _rsa_encrypt_reference(m: int, public_key: tuple) -> int:
+    """rsa_encrypt d'origine : contrôle de m puis pow."""
+    n, e = public_key
+    if m < 0 or m >= n:
+        raise ValueError(f"Le message doit être un entier entre 0 et {n-1}")
+    return pow(m, e, n)
+
+
+def _rsa_decrypt_reference(c: int, private_key: tuple) -> int:
+    """rsa_decrypt d'origine (sans CRT) ; la clé est donnée sous forme CRT."""
+    n, d = private_key[:2]
+    return pow(c, d, n)
+
+
+# Fonctions de référence : cas -> fonction(*arguments)
+ORACLES = {
+    "cesar_encrypt": cesar_cypher.cesar_encrypt,
+    "substitution_encrypt": substitution_cypher.encrypt,
+    "substitution_decrypt": substitution_cypher.decrypt,
+    "xor_encrypt": cryptage_xor.xor_encrypt,
+    "feistel_encrypt": feistel_block_cypher_cryptage.feistel_encrypt,
+    "rsa_encrypt": _rsa_encrypt_reference,
+    "rsa_decrypt": _rsa_decrypt_reference,
+}
+
+# Implémentations rapides : cas -> {nom: (fonction, domaine ou None, chronométrée)}
+BACKENDS = {case: {} for case in ORACLES}
+
+# Tailles testées par défaut (caractères ou octets ; bits du module pour RSA)
+DEFAULT_SIZES = (16, 256, 4096)
+RSA_SIZES = (512, 1024, 2048)
+
+# Nombre de divergences détaillées par implémentation dans le rapport
+MAX_REPORTED = 3
+
+# Chronométrage : meilleur de TIMING_REPEAT passages sur au plus
+# TIMED_INPUTS entrées (les dernières retenues, donc aléatoires) ; un
+# passage répète les entrées pour durer au moins TIMING_MIN_SECONDS
+TIMING_REPEAT = 5
+TIMED_INPUTS = 64
+TIMING_MIN_SECONDS = 0.02
+
+# Backend "fichier" : nombre minimal d'intervalles mmap du fichier écrit et
+# nombre de processus qui les traitent
+FILE_RANGES = 3
+FILE_WORKERS = 2
+
+# Caractères des textes aléatoires : surtout de l'ASCII, quelques lettres
+# non ASCII (accents, ß, grec, digramme titre, ligature) et non-lettres
+_ASCII_CHARS = string.ascii_letters + string.digits + " .,;:!?'-\n"
+_EXOTIC_CHARS = "éèàçÉÀßΩωǅﬁ٣€😀\x1f"
+
+
+def register_backend(case: str, name: str, function, domain=None, timed: bool = True) -> None:
+    """
+    Enregistre une implémentation rapide à comparer à l'oracle d'un cas.
+
+    Args:
+        case: Le cas (clé de ORACLES)
+        name: Le nom de l'implémentation
+        function: La fonction, avec les mêmes arguments que l'oracle
+        domain: Prédicat sur les arguments ; les entrées refusées ne sont
+                pas testées (None = toutes les entrées)
+        timed: False si un appel inclut un coût fixe sans rapport avec
+               l'oracle (pool, fichiers) : vérifiée mais pas chronométrée
+    """
+    if case not in ORACLES:
+        raise ValueError(f"Cas inconnu: {case}")
+    BACKENDS[case][name] = (function, domain, timed)
+
+
+# --- Implémentations rapides ---
+
+def _rsa_encrypt_engine(backend: str):
+    def encrypt(m: int, public_key: tuple) -> int:
+        n, e = public_key
+        if m < 0 or m >= n:
+            raise ValueError(f"Le message doit être un entier entre 0 et {n-1}")
+        return ModExpEngine(n, e, backend)(m)
+    return encrypt
+
+
+def _rsa_decrypt_window(c: int, private_key: tuple) -> int:
+    n, d = private_key[:2]
+    return ModExpEngine(n, d, "window")(c)
+
+
+def _colonnes(algo: str, operation: str = "encrypt"):
+    """Transformation de chiffrement_colonnes appliquée à une seule valeur."""
+    def run(value, key):
+        keys = {"cesar": key, "substitution": key, "xor": key}
+        if algo == "substitution" and operation == "decrypt":
+            # build_transforms attend le mapping de chiffrement
+            keys["substitution"] = substitution_cypher.get_reverse_mapping(key)
+        transform = chiffrement_colonnes.build_transforms({"c": algo}, keys, operation)["c"]
+        if algo == "xor":
+            return base64.b64decode(transform([value.decode('utf-8')])[0])
+        return transform([value])[0]
+    return run
+
+
+def _fichier(algo: str):
+    """
+    transformation_fichier.transform_file sur un fichier temporaire.
+
+    Les textes générés sont plus courts qu'un intervalle (aligné sur
+    ALLOCATIONGRANULARITY) : le fichier contient le texte répété sur au
+    moins FILE_RANGES intervalles, traités par FILE_WORKERS processus.
+    Chaque copie doit être identique à la première, comparée à l'oracle.
+    """
+    def run(text, key):
+        # Pour decrypt, la clé reçue est déjà le mapping inverse
+        table = transformation_fichier.byte_table(algo, key)
+        data = text.encode('ascii')
+        copies = -(-FILE_RANGES * mmap.ALLOCATIONGRANULARITY // len(data)) if data else 1
+        with tempfile.TemporaryDirectory() as directory:
+            src, dst = os.path.join(directory, "entree"), os.path.join(directory, "sortie")
+            with open(src, 'wb') as f:
+                f.write(data * copies)
+            transformation_fichier.transform_file(src, dst, table, FILE_WORKERS,
+                                                  min_range_size=mmap.ALLOCATIONGRANULARITY)
+            with open(dst, 'rb') as f:
+                output = f.read()
+        first = output[:len(data)]
+        if output != first * copies:
+            raise RuntimeError("Intervalles du fichier transformés différemment")
+        return first.decode('ascii')
+    return run
+
+
+def _ascii_text(text, key) -> bool:
+    return text.isascii()
+
+
+def _utf8_data(data, key) -> bool:
+    try:
+        data.decode('utf-8')
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+register_backend("cesar_encrypt", "translate", cesar_cypher.cesar_translate)
+register_backend("cesar_encrypt", "colonnes", _colonnes("cesar"), _ascii_text)
+register_backend("cesar_encrypt", "fichier", _fichier("cesar"), _ascii_text, timed=False)
+register_backend("substitution_encrypt", "translate", substitution_cypher.translate)
+register_backend("substitution_encrypt", "colonnes", _colonnes("substitution"))
+register_backend("substitution_encrypt", "fichier", _fichier("substitution"), _ascii_text, timed=False)
+register_backend("substitution_decrypt", "translate", substitution_cypher.translate)
+register_backend("substitution_decrypt", "colonnes", _colonnes("substitution", "decrypt"))
+register_backend("substitution_decrypt", "fichier", _fichier("substitution"), _ascii_text, timed=False)
+register_backend("xor_encrypt", "int", cryptage_xor.xor_encrypt_int)
+register_backend("xor_encrypt", "colonnes", _colonnes("xor"), _utf8_data)
+register_backend("feistel_encrypt", "int", feistel_block_cypher_cryptage.feistel_encrypt_int)
+register_backend("rsa_encrypt", "get_engine", RSA.rsa_encrypt)
+register_backend("rsa_encrypt", "window", _rsa_encrypt_engine("window"))
+if GMPY2_AVAILABLE:
+    register_backend("rsa_encrypt", "gmpy2", _rsa_encrypt_engine("gmpy2"))
+register_backend("rsa_decrypt", "crt", RSA.rsa_decrypt)
+register_backend("rsa_decrypt", "window", _rsa_decrypt_window)
+
+
+# --- Génération des entrées ---
+
+def _random_text(rng: random.Random, size: int) -> str:
+    # Une entrée sur deux est purement ASCII (domaine des implémentations ASCII)
+    exotic = 0.05 if rng.random() < 0.5 else 0.0
+    chars = [rng.choice(_EXOTIC_CHARS) if rng.random() < exotic else rng.choice(_ASCII_CHARS)
+             for _ in range(size)]
+    return "".join(chars)
+
+
+def _random_mapping(rng: random.Random) -> dict:
+    shuffled = list(string.ascii_lowercase)
+    rng.shuffle(shuffled)
+    mapping = {}
+    for letter, target in zip(string.ascii_lowercase, shuffled):
+        mapping[letter] = target
+        mapping[letter.upper()] = target.upper()
+    return mapping
+
+
+def _edge_texts() -> list:
+    return ["", "a", "Z", "z", "AZaz", " ", "!?.,", "é", "Éléphant", "ß", "ǅ", "ﬁn",
+            "Ω", "😀", "\x1f", "\x00", "\n\t", string.ascii_letters, "123 abc XYZ"]
+
+
+def generate_inputs(case: str, size: int, count: int, seed: int = 0) -> list:
+    """
+    Génère des arguments pour un cas : cas limites puis entrées aléatoires.
+
+    Args:
+        case: Le cas (clé de ORACLES)
+        size: La taille des entrées (bits du module pour RSA)
+        count: Le nombre d'entrées aléatoires
+        seed: La graine (mêmes entrées pour une même graine)
+
+    Returns:
+        Une liste de tuples d'arguments
+    """
+    rng = random.Random(f"{seed}/{case}/{size}")
+
+    if case == "cesar_encrypt":
+        inputs = [(text, shift) for text in _edge_texts() for shift in (0, 1, 13, 25, 26, -1, 27, -53)]
+        inputs += [(_random_text(rng, size), rng.randrange(-30, 60)) for _ in range(count)]
+    elif case in ("substitution_encrypt", "substitution_decrypt"):
+        mapping = _random_mapping(rng)
+        if case == "substitution_decrypt":
+            mapping = substitution_cypher.get_reverse_mapping(mapping)
+        inputs = [(text, mapping) for text in _edge_texts()]
+        inputs += [(_random_text(rng, size), _random_mapping(rng) if rng.random() < 0.1 else mapping)
+                   for _ in range(count)]
+    elif case == "xor_encrypt":
+        inputs = [(b"", b""), (b"", b"k"), (b"a", b"k"), (b"abc", b"longue cle"),
+                  (b"\x00" * 5, b"\xff"), ("é".encode('utf-8'), b"\x80"), (b"\xff\xfe", b"\x01")]
+        inputs += [(rng.randbytes(size), rng.randbytes(rng.randint(1, 40))) for _ in range(count // 2)]
+        inputs += [(_random_text(rng, size).encode('utf-8'), rng.randbytes(rng.randint(1, 40)))
+                   for _ in range(count - count // 2)]
+    elif case == "feistel_encrypt":
+        inputs = [(text, k1, k2) for text in _edge_texts() + ["Ā", "aĀ", "ÿ"]
+                  for k1, k2 in (("0", "1"), ("1010", "0110"), ("1" * 100, "0" * 3))]
+        inputs += [("abc", "", "1")]
+        for _ in range(count):
+            text = _random_text(rng, size)
+            half = 4 * len(text.encode('utf-8'))
+            key1 = "".join(rng.choice("01") for _ in range(rng.randint(1, half + 8)))
+            key2 = "".join(rng.choice("01") for _ in range(rng.randint(1, half + 8)))
+            inputs.append((text, key1, key2))
+    elif case in ("rsa_encrypt", "rsa_decrypt"):
+        public_key, private_key = RSA.rsa_keygen(size, crt=True)
+        n = public_key[0]
+        key = public_key if case == "rsa_encrypt" else private_key
+        values = [0, 1, 2, n - 1, n - 2] + [rng.randrange(n) for _ in range(count)]
+        if case == "rsa_encrypt":
+            values += [n, n + 1, -1]
+        else:
+            values += [n, n + 5]
+        inputs = [(value, key) for value in values]
+    else:
+        raise ValueError(f"Cas inconnu: {case}")
+    return inputs
+
+
+# --- Exécution ---
+
+def _outcome(function, arguments: tuple) -> tuple:
+    """Résultat d'un appel : ("ok", valeur) ou ("erreur", type de l'exception)."""
+    try:
+        return "ok", function(*arguments)
+    except Exception as error:
+        return "erreur", type(error).__name__
+
+
+def _short(value, limit: int = 60) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _pass_time(function, arguments_list: list, number: int = 1) -> float:
+    """Durée de number passages de function sur toutes les entrées (exceptions comprises)."""
+    start = time.perf_counter()
+    for _ in range(number):
+        for arguments in arguments_list:
+            try:
+                function(*arguments)
+            except Exception:
+                pass
+    return time.perf_counter() - start
+
+
+def _autorange(function, arguments_list: list) -> int:
+    """Nombre de passages pour durer au moins TIMING_MIN_SECONDS (comme timeit)."""
+    number = 1
+    while _pass_time(function, arguments_list, number) < TIMING_MIN_SECONDS:
+        number *= 2
+    return number
+
+
+def run_case(case: str, size: int, count: int, seed: int = 0, repeat: int = TIMING_REPEAT) -> list:
+    """
+    Compare toutes les implémentations d'un cas à l'oracle, pour une taille.
+
+    Exécuté dans le pool de processus. Le passage de vérification échauffe
+    chaque fonction ; le chronométrage vient ensuite.
+
+    Args:
+        case: Le cas (clé de ORACLES)
+        size: La taille des entrées
+        count: Le nombre d'entrées aléatoires
+        seed: La graine
+        repeat: Le nombre de passages chronométrés (le meilleur est retenu)
+
+    Returns:
+        Une liste de dictionnaires (un par implémentation) : case, backend,
+        size, checked, mismatches, examples, speedup (None si non chronométrée)
+    """
+    inputs = generate_inputs(case, size, count, seed)
+    oracle = ORACLES[case]
+    expected = [_outcome(oracle, arguments) for arguments in inputs]
+
+    results = []
+    for name, (function, domain, timed) in BACKENDS[case].items():
+        selected = [i for i, arguments in enumerate(inputs) if domain is None or domain(*arguments)]
+        outcomes = [_outcome(function, inputs[i]) for i in selected]
+
+        examples = []
+        mismatches = 0
+        for i, outcome in zip(selected, outcomes):
+            if outcome != expected[i]:
+                mismatches += 1
+                if len(examples) < MAX_REPORTED:
+                    examples.append((_short(inputs[i]), _short(expected[i]), _short(outcome)))
+
+        speedup = None
+        if timed and selected:
+            # Mêmes entrées pour les deux, passages alternés : la charge de la
+            # machine pèse autant sur l'oracle que sur l'implémentation
+            sample = [inputs[i] for i in selected[-TIMED_INPUTS:]]
+            oracle_number, number = _autorange(oracle, sample), _autorange(function, sample)
+            oracle_time = elapsed = float('inf')
+            for _ in range(max(1, repeat)):
+                oracle_time = min(oracle_time, _pass_time(oracle, sample, oracle_number) / oracle_number)
+                elapsed = min(elapsed, _pass_time(function, sample, number) / number)
+            speedup = oracle_time / elapsed if elapsed > 0 else float('inf')
+
+        results.append({
+            "case": case, "backend": name, "size": size, "checked": len(selected),
+            "mismatches": mismatches, "examples": examples, "speedup": speedup,
+        })
+    return results
+
+
+def verify(cases: list = None, sizes: tuple = DEFAULT_SIZES, count: int = 200,
+           seed: int = 0, workers: int = None, repeat: int = TIMING_REPEAT) -> list:
+    """
+    Lance la vérification différentielle de tous les cas demandés.
+
+    Args:
+        cases: Les cas à vérifier (None = tous)
+        sizes: Les tailles des entrées (les cas RSA utilisent RSA_SIZES)
+        count: Le nombre d'entrées aléatoires par cas et par taille
+        seed: La graine
+        workers: Le nombre de processus (None = nombre de cœurs)
+        repeat: Le nombre de passages chronométrés par implémentation
+
+    Returns:
+        Les résultats de run_case, mis bout à bout
+    """
+    cases = list(ORACLES) if cases is None else cases
+    tasks = [(case, size) for case in cases
+             for size in (RSA_SIZES if case.startswith("rsa") else sizes)]
+    if workers is None:
+        workers = os.cpu_count()
+
+    arguments = ([case for case, _ in tasks], [size for _, size in tasks],
+                 [count] * len(tasks), [seed] * len(tasks), [repeat] * len(tasks))
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(run_case, *arguments))
+    else:
+        batches = list(map(run_case, *arguments))
+    return [result for batch in batches for result in batch]
+
+
+def print_report(results: list) -> None:
+    """Affiche le tableau des résultats puis le détail des divergences."""
+    print(f"{'cas':<22} {'implémentation':<15} {'taille':>7} {'entrées':>8} "
+          f"{'divergences':>12} {'accélération':>13}")
+    for result in results:
+        speedup = "-" if result["speedup"] is None else f"{result['speedup']:.1f}x"
+        print(f"{result['case']:<22} {result['backend']:<15} {result['size']:>7} "
+              f"{result['checked']:>8} {result['mismatches']:>12} {speedup:>13}")
+
+    for result in results:
+        for arguments, expected, got in result["examples"]:
+            print(f"\n[{result['case']} / {result['backend']} / {result['size']}]")
+            print(f"  entrée  : {arguments}")
+            print(f"  attendu : {expected}")
+            print(f"  obtenu  : {got}")
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande (code 1 en cas de divergence)."""
+    parser = argparse.ArgumentParser(description="Vérification différentielle des implémentations rapides")
+    parser.add_argument("--cas", nargs="+", choices=list(ORACLES), help="Cas à vérifier (tous par défaut)")
+    parser.add_argument("--tailles", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Tailles des entrées")
+    parser.add_argument("--nombre", type=int, default=200, help="Entrées aléatoires par cas et par taille")
+    parser.add_argument("--graine", type=int, default=0, help="Graine des entrées aléatoires")
+    parser.add_argument("--workers", type=int, help="Nombre de processus")
+    parser.add_argument("--repetitions", type=int, default=TIMING_REPEAT,
+                        help="Passages chronométrés (meilleur retenu)")
+    arguments = parser.parse_args(argv)
+
+    results = verify(arguments.cas, tuple(arguments.tailles), arguments.nombre,
+                     arguments.graine, arguments.workers, arguments.repetitions)
+    print_report(results)
+    return 1 if any(result["mismatches"] for result in results) else 0
+
+
+# Exemple d'utilisation
+if __name__ == "__main__":
+    sys.exit(main())